@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Email Templates Demo
+
+Renders sample intake form emails so the template wording can be reviewed
+without sending anything.
+"""
+
+import sys
+from pathlib import Path
+
+# Add src to path for imports
+current_dir = Path(__file__).parent
+sys.path.append(str(current_dir.parent / 'src'))
+
+from utils.email_templates import IntakeFormEmailTemplates
+
+
+def main():
+    """Print the confirmation and reminder emails for a sample patient"""
+    templates = IntakeFormEmailTemplates("Springfield Medical Center", "(555) 123-4567")
+    
+    # Example patient data
+    patient_data = {
+        "first_name": "John",
+        "last_name": "Doe",
+        "appointment_date": "January 15, 2024",
+        "appointment_time": "10:00 AM",
+        "doctor_name": "Dr. Sarah Johnson",
+        "clinic_address": "123 Medical Drive, Springfield, IL",
+        "intake_form_link": "https://clinic.com/intake/form/abc123",
+        "patient_portal_link": "https://clinic.com/portal"
+    }
+    
+    # Generate confirmation email
+    confirmation = templates.appointment_confirmation_with_intake_form(patient_data)
+    print("APPOINTMENT CONFIRMATION EMAIL:")
+    print(f"Subject: {confirmation.subject}")
+    print(f"Body:\n{confirmation.body}")
+    print("\n" + "="*80 + "\n")
+    
+    # Generate reminder email
+    reminder = templates.intake_form_reminder(patient_data)
+    print("INTAKE FORM REMINDER EMAIL:")
+    print(f"Subject: {reminder.subject}")
+    print(f"Body:\n{reminder.body}")
+
+
+if __name__ == "__main__":
+    main()
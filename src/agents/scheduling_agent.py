@@ -4,8 +4,15 @@ Main orchestrator for the appointment scheduling system using LangChain/LangGrap
 """
 
 import os
+import re
 import json
+import string
+import functools
+import sqlite3
+import tempfile
+import threading
 import pandas as pd
+from contextlib import closing
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple, Any
 from pathlib import Path
@@ -39,6 +46,134 @@ except ImportError:
         IntakeFormHandler = None
 
 
+# Manual reminder query parsing: reminder type per keyword, in priority order
+REMINDER_TYPE_KEYWORDS = {
+    "regular": "regular",
+    "form": "form_check",
+    "confirm": "confirmation"
+}
+APPOINTMENT_ID_PATTERN = re.compile(r'APT_\d{8}_\d{6}')
+PATIENT_ID_PATTERN = re.compile(r'P\d+')
+
+# Serializes SQLite lookup cache rebuilds across agents (e.g. concurrent Streamlit sessions)
+_SQLITE_REBUILD_LOCK = threading.Lock()
+
+# Reminder tool responses, filled in with safe_substitute
+REMINDER_STATUS_TEMPLATE = string.Template("""
+$title
+
+📊 **Summary:**
+- Total: $total
+- Scheduled: $scheduled
+- Sent: $sent
+- Failed: $failed
+
+🔔 **Reminder Details:**
+$details
+
+$truncation_note
+""")
+
+MANUAL_REMINDER_SENT_TEMPLATE = string.Template("""
+✅ **Manual Reminder Sent**
+
+📅 Appointment: $appointment_id
+👤 Patient: $patient_name
+🔔 Type: $reminder_type reminder
+📧 Email: $email_status
+📱 SMS: $sms_status
+
+The patient has been notified about their upcoming appointment.
+""")
+
+PATIENT_RESPONSE_TEMPLATE = string.Template("""
+$icon **Patient Response Processed**
+
+📝 Response: "$response_text"
+🔄 Action: $action
+💬 Message: $message
+
+""")
+
+REMINDER_RUN_SUMMARY_TEMPLATE = string.Template("""
+🔄 **Reminder System Run Complete**
+
+📊 **Results:**
+- ✅ Sent: $sent
+- ❌ Failed: $failed
+- ⚠️ Skipped: $skipped
+
+""")
+
+SMS_CONFIGURATION_TEMPLATE = string.Template("""
+📱 **SMS Service Configuration**
+
+🔧 **Current Status:** $provider mode
+
+$provider_instructions
+
+🚀 **Quick Start for Real SMS:**
+
+**Option 1: Twilio (Recommended)**
+```bash
+# Install Twilio
+pip install twilio
+
+# Set environment variables (replace with your values)
+export TWILIO_ACCOUNT_SID="your_account_sid_here"
+export TWILIO_AUTH_TOKEN="your_auth_token_here"  
+export TWILIO_PHONE_NUMBER="+1234567890"
+
+# Restart the application
+```
+
+**Option 2: AWS SNS**
+```bash
+# Install boto3
+pip install boto3
+
+# Configure AWS credentials
+aws configure
+# OR set environment variables:
+export AWS_ACCESS_KEY_ID="your_access_key"
+export AWS_SECRET_ACCESS_KEY="your_secret_key"
+export AWS_DEFAULT_REGION="us-east-1"
+
+# Restart the application
+```
+
+📊 **SMS Usage Statistics:**
+- Current mode: Simulated (no cost, perfect for testing)
+- Real SMS cost: ~$$0.0075 per message
+- Supported features: Delivery confirmations, status tracking
+
+💡 **Need Help?** 
+- Ask me: "How do I set up Twilio SMS?"
+- Ask me: "Show AWS SNS setup instructions"
+- Visit: https://docs.twilio.com/ or https://docs.aws.amazon.com/sns/
+""")
+
+
+def requires_reminder_engine(action: str):
+    """
+    Guard an agent tool that needs the reminder engine
+    
+    Returns the standard unavailable message when the engine is missing and
+    turns any exception into a "❌ Error <action>: ..." tool response.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if not self.reminder_engine:
+                return "❌ Reminder system not available"
+            try:
+                return method(self, *args, **kwargs)
+            except Exception as e:
+                return f"❌ Error {action}: {str(e)}"
+        return wrapper
+    return decorator
+
+
 class MedicalSchedulingAgent:
     """
     Main scheduling agent that orchestrates the entire appointment booking process
@@ -47,11 +182,16 @@ class MedicalSchedulingAgent:
     def __init__(self, 
                  openai_api_key: Optional[str] = None,
                  data_dir: str = "data",
-                 model_name: str = "gpt-3.5-turbo"):
+                 model_name: str = "gpt-3.5-turbo",
+                 email_service: Optional["SMTPEmailService"] = None):
         
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(parents=True, exist_ok=True)
         
+        # Resolve the CSV paths used on every lookup once
+        self._appointments_csv = self.data_dir / "appointments" / "scheduled_appointments.csv"
+        self._patients_csv = self.data_dir / "patients" / "patient_database.csv"
+        
         # Initialize logging
         logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
@@ -76,7 +216,8 @@ class MedicalSchedulingAgent:
             
         # Initialize email service and reminder system
         if SMTPEmailService and IntakeFormEmailTemplates:
-            self.email_service = SMTPEmailService()
+            # Reuse a caller's service (and its open SMTP session) instead of building another
+            self.email_service = email_service or SMTPEmailService()
             self.email_templates = IntakeFormEmailTemplates()
             
             # Initialize reminder engine
@@ -116,7 +257,7 @@ class MedicalSchedulingAgent:
     def _load_patients_data(self) -> pd.DataFrame:
         """Load patient database"""
         try:
-            return pd.read_csv(self.data_dir / "patients" / "patient_database.csv")
+            return pd.read_csv(self._patients_csv)
         except FileNotFoundError:
             self.logger.warning("Patient database not found. Creating empty DataFrame.")
             return pd.DataFrame()
@@ -131,7 +272,7 @@ class MedicalSchedulingAgent:
     
     def _load_appointments_data(self) -> pd.DataFrame:
         """Load existing appointments"""
-        appointments_file = self.data_dir / "appointments" / "scheduled_appointments.csv"
+        appointments_file = self._appointments_csv
         if appointments_file.exists():
             return pd.read_csv(appointments_file)
         else:
@@ -144,6 +285,52 @@ class MedicalSchedulingAgent:
             df.to_csv(appointments_file, index=False)
             return df
     
+    def _ensure_sqlite(self) -> sqlite3.Connection:
+        """
+        Open the SQLite lookup cache, rebuilding it from the CSV files when they are newer
+        
+        Returns:
+            Connection with indexed appointments and patients tables
+        """
+        db_path = self.data_dir / "cache.sqlite"
+        sources = {
+            "appointments": (self._appointments_csv, "appointment_id"),
+            "patients": (self._patients_csv, "patient_id")
+        }
+        
+        def is_stale() -> bool:
+            # Rebuild when a CSV changed at or after the last rebuild; >= because mtimes are coarse
+            db_mtime = db_path.stat().st_mtime_ns if db_path.exists() else 0
+            return db_mtime == 0 or any(
+                csv_path.exists() and csv_path.stat().st_mtime_ns >= db_mtime
+                for csv_path, _ in sources.values()
+            )
+        
+        if is_stale():
+            with _SQLITE_REBUILD_LOCK:
+                # Another session may have rebuilt the cache while this one waited
+                if is_stale():
+                    # Build into a temporary file and swap it in, so readers never see a half-built cache
+                    fd, tmp_name = tempfile.mkstemp(suffix=".sqlite.tmp", dir=self.data_dir)
+                    os.close(fd)
+                    try:
+                        with closing(sqlite3.connect(tmp_name)) as tmp_conn:
+                            for table, (csv_path, key_column) in sources.items():
+                                if not csv_path.exists():
+                                    continue
+                                pd.read_csv(csv_path).to_sql(table, tmp_conn, if_exists="replace", index=False)
+                                tmp_conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_{key_column} ON {table}({key_column})")
+                            tmp_conn.commit()
+                        os.replace(tmp_name, db_path)
+                    except Exception:
+                        Path(tmp_name).unlink(missing_ok=True)
+                        raise
+                    self.logger.info("Rebuilt SQLite lookup cache")
+        
+        conn = sqlite3.connect(db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+    
     def _create_agent_tools(self) -> List[Tool]:
         """Create tools for the scheduling agent"""
         
@@ -571,7 +758,7 @@ Patient ID: {patient['patient_id']}
             }
             
             # Save appointment
-            appointments_file = self.data_dir / "appointments" / "scheduled_appointments.csv"
+            appointments_file = self._appointments_csv
             
             if appointments_file.exists():
                 appointments_df = pd.read_csv(appointments_file)
@@ -696,7 +883,7 @@ Would you like me to:
             }
             
             # Save to patient database
-            patients_file = self.data_dir / "patients" / "patient_database.csv"
+            patients_file = self._patients_csv
             
             if patients_file.exists():
                 patients_df = pd.read_csv(patients_file)
@@ -732,7 +919,7 @@ Would you like me to:
     def _reload_patient_database(self):
         """Reload the patient database to reflect recent changes"""
         try:
-            patients_file = self.data_dir / "patients" / "patient_database.csv"
+            patients_file = self._patients_csv
             if patients_file.exists():
                 self.patients_df = pd.read_csv(patients_file)
             else:
@@ -1083,17 +1270,24 @@ Experience: {doctor['years_experience']} years
         except Exception as e:
             return f"Error checking insurance: {str(e)}"
     
-    def _send_intake_form(self, patient_info: str) -> str:
-        """Send intake form to patient"""
+    def _send_intake_form(self, patient_info: str = "", patient_email: Optional[str] = None) -> str:
+        """
+        Send intake form to patient
+        
+        Args:
+            patient_info: Free-text patient details, as passed by the LangChain tool
+            patient_email: Recipient address for direct callers; skips extracting it from patient_info
+        """
         try:
             # Generate intake form link (local development)
             form_id = f"FORM_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
             # Use local development URL instead of external domain
             form_link = f"http://localhost:8501/intake/{form_id}"  # Streamlit default port
             
-            # Extract patient email from patient_info (simplified extraction)
-            # In a real implementation, this would parse the patient_info properly
-            patient_email = "charulchim06@gmail.com"  # Default to your email for testing
+            if not patient_email:
+                # Extract patient email from patient_info (simplified extraction)
+                # In a real implementation, this would parse the patient_info properly
+                patient_email = "charulchim06@gmail.com"  # Default to your email for testing
             
             # Prepare patient data
             patient_data = {
@@ -1205,7 +1399,7 @@ If you need to reschedule, please let me know your preferred dates and times.
             from openpyxl.utils.dataframe import dataframe_to_rows
             
             # Load appointments data
-            appointments_file = self.data_dir / "appointments" / "scheduled_appointments.csv"
+            appointments_file = self._appointments_csv
             if not appointments_file.exists():
                 return "❌ No appointments found to export"
             
@@ -1514,8 +1708,8 @@ Status: Logged
             
             # Files to backup
             backup_files = [
-                self.data_dir / "appointments" / "scheduled_appointments.csv",
-                self.data_dir / "patients" / "patient_database.csv",
+                self._appointments_csv,
+                self._patients_csv,
                 self.data_dir / "doctors" / "doctor_profiles.csv",
                 self.data_dir / "doctors" / "doctor_schedules.xlsx"
             ]
@@ -1647,8 +1841,8 @@ Status: Logged
                     # Send email with intake form
                     email_sent = self.email_service.send_intake_form_email(
                         email_patient_data['email'],
-                        email_template['subject'],
-                        email_template['body'],
+                        email_template.subject,
+                        email_template.body,
                         form_attachment=form_file if form_file else None
                     )
                 except Exception as e:
@@ -2015,22 +2209,19 @@ I'm here to help with appointment scheduling. I can assist with:
 Could you please let me know specifically what you'd like help with today?
 """
     
+    @requires_reminder_engine("scheduling reminders")
     def _schedule_appointment_reminders(self, appointment_id: str) -> str:
         """Schedule automated reminders for an appointment"""
-        try:
-            if not self.reminder_engine:
-                return "❌ Reminder system not available"
+        result = self.reminder_engine.schedule_reminders_for_appointment(appointment_id)
+        
+        if result['status'] == 'success':
+            reminders = result.get('reminders', [])
+            reminder_details = []
             
-            result = self.reminder_engine.schedule_reminders_for_appointment(appointment_id)
+            for reminder in reminders:
+                reminder_details.append(f"• {reminder['type'].title()} reminder - {reminder['scheduled_for']} via {reminder['method']}")
             
-            if result['status'] == 'success':
-                reminders = result.get('reminders', [])
-                reminder_details = []
-                
-                for reminder in reminders:
-                    reminder_details.append(f"• {reminder['type'].title()} reminder - {reminder['scheduled_for']} via {reminder['method']}")
-                
-                return f"""
+            return f"""
 ✅ **Reminder System Activated**
 
 📅 Appointment ID: {appointment_id}
@@ -2045,282 +2236,243 @@ Could you please let me know specifically what you'd like help with today?
 
 Patients will receive reminders via email and/or SMS based on their preferences.
 """
-            else:
-                return f"❌ Failed to schedule reminders: {result.get('message', 'Unknown error')}"
-                
-        except Exception as e:
-            return f"❌ Error scheduling reminders: {str(e)}"
+        else:
+            return f"❌ Failed to schedule reminders: {result.get('message', 'Unknown error')}"
     
+    @requires_reminder_engine("checking reminder status")
     def _check_reminder_status(self, query: str) -> str:
         """Check reminder status for appointments or patients"""
-        try:
-            if not self.reminder_engine:
-                return "❌ Reminder system not available"
-            
-            # Parse query to extract appointment ID or patient ID
-            appointment_id = None
-            patient_id = None
-            
-            if "APT_" in query.upper():
-                import re
-                apt_match = re.search(r'APT_\d{8}_\d{6}', query.upper())
-                if apt_match:
-                    appointment_id = apt_match.group()
-            
-            elif "P" in query.upper() and any(char.isdigit() for char in query):
-                import re
-                patient_match = re.search(r'P\d+', query.upper())
-                if patient_match:
-                    patient_id = patient_match.group()
-            
-            # Get reminder status
-            if appointment_id:
-                status = self.reminder_engine.get_reminder_status(appointment_id=appointment_id)
-                title = f"📅 Reminders for Appointment {appointment_id}"
-            elif patient_id:
-                status = self.reminder_engine.get_reminder_status(patient_id=patient_id)
-                title = f"👤 Reminders for Patient {patient_id}"
-            else:
-                status = self.reminder_engine.get_reminder_status()
-                title = "🔔 All System Reminders"
-            
-            summary = status.get('summary', {})
-            reminders = status.get('reminders', [])
-            
-            if not reminders:
-                return f"""
+        # Parse query to extract appointment ID or patient ID
+        appointment_id = None
+        patient_id = None
+        
+        if "APT_" in query.upper():
+            apt_match = APPOINTMENT_ID_PATTERN.search(query.upper())
+            if apt_match:
+                appointment_id = apt_match.group()
+        
+        elif "P" in query.upper() and any(char.isdigit() for char in query):
+            patient_match = PATIENT_ID_PATTERN.search(query.upper())
+            if patient_match:
+                patient_id = patient_match.group()
+        
+        # Restrict to today's reminders when asked, so the engine only keeps matching rows
+        on_date = datetime.now().date() if "today" in query.lower() else None
+        
+        # Get reminder status
+        if appointment_id:
+            status = self.reminder_engine.get_reminder_status(appointment_id=appointment_id, on_date=on_date, limit=10)
+            title = f"📅 Reminders for Appointment {appointment_id}"
+        elif patient_id:
+            status = self.reminder_engine.get_reminder_status(patient_id=patient_id, on_date=on_date, limit=10)
+            title = f"👤 Reminders for Patient {patient_id}"
+        else:
+            status = self.reminder_engine.get_reminder_status(on_date=on_date, limit=10)
+            title = "🔔 All System Reminders"
+        
+        if on_date:
+            title += " (Today)"
+        
+        summary = status.get('summary', {})
+        reminders = status.get('reminders', [])
+        
+        if not reminders:
+            return f"""
 {title}
 
 📊 **Status: No reminders found**
 
 To schedule reminders for an appointment, use the appointment ID.
 """
-            
-            # Format reminder details
-            reminder_list = []
-            for reminder in reminders[:10]:  # Show up to 10 reminders
-                # Handle NaN values in pandas data
-                reminder_id = reminder.get('reminder_id', 'N/A')
-                reminder_type = reminder.get('reminder_type', 'N/A')
-                scheduled_time = str(reminder.get('scheduled_time', 'N/A'))[:16]
-                delivery_method = reminder.get('delivery_method', 'N/A')
-                status = reminder.get('status', 'N/A')
-                sent_at = str(reminder.get('sent_at', ''))[:16] if reminder.get('sent_at') else 'Not sent'
-                
-                reminder_list.append(f"""
-• **{reminder_type.title()} Reminder**
-  - ID: {reminder_id}
+        
+        # Format reminder details
+        reminder_list = []
+        for reminder in reminders:  # Engine returns at most 10
+            # Missing ledger values arrive as None
+            scheduled_time = str(reminder.scheduled_time or 'N/A')[:16]
+            sent_at = str(reminder.sent_at)[:16] if reminder.sent_at else 'Not sent'
+            
+            reminder_list.append(f"""
+• **{(reminder.reminder_type or 'N/A').title()} Reminder**
+  - ID: {reminder.reminder_id or 'N/A'}
   - Scheduled: {scheduled_time}
-  - Method: {delivery_method}
-  - Status: {status.title()}
+  - Method: {reminder.delivery_method or 'N/A'}
+  - Status: {(reminder.status or 'N/A').title()}
   - Sent: {sent_at}
 """)
-            
-            return f"""
-{title}
-
-📊 **Summary:**
-- Total: {summary.get('total', 0)}
-- Scheduled: {summary.get('scheduled', 0)}
-- Sent: {summary.get('sent', 0)}
-- Failed: {summary.get('failed', 0)}
-
-🔔 **Reminder Details:**
-{''.join(reminder_list)}
-
-{'...(showing first 10 of ' + str(len(reminders)) + ')' if len(reminders) > 10 else ''}
-"""
-            
-        except Exception as e:
-            return f"❌ Error checking reminder status: {str(e)}"
+        
+        total = summary.get('total', 0)
+        return REMINDER_STATUS_TEMPLATE.safe_substitute(
+            title=title,
+            total=total,
+            scheduled=summary.get('scheduled', 0),
+            sent=summary.get('sent', 0),
+            failed=summary.get('failed', 0),
+            details=''.join(reminder_list),
+            truncation_note=f"...(showing first 10 of {total})" if total > 10 else ''
+        )
     
+    @requires_reminder_engine("sending manual reminder")
     def _send_manual_reminder(self, query: str) -> str:
         """Manually send a specific reminder"""
-        try:
-            if not self.reminder_engine:
-                return "❌ Reminder system not available"
-            
-            # Parse query for reminder type, appointment ID, or patient ID
-            query_lower = query.lower()
-            
-            if "regular" in query_lower:
-                reminder_type = "regular"
-            elif "form" in query_lower:
-                reminder_type = "form_check"
-            elif "confirm" in query_lower:
-                reminder_type = "confirmation"
-            else:
-                return "❌ Please specify reminder type: regular, form_check, or confirmation"
-            
-            # Extract appointment or patient ID
-            appointment_id = None
-            if "APT_" in query.upper():
-                import re
-                apt_match = re.search(r'APT_\d{8}_\d{6}', query.upper())
-                if apt_match:
-                    appointment_id = apt_match.group()
-            
-            if not appointment_id:
-                return "❌ Please provide an appointment ID (e.g., APT_20250906_123456)"
-            
-            # Load appointment data and send reminder
-            appointments_df = pd.read_csv(self.data_dir / "appointments" / "scheduled_appointments.csv")
-            appointment = appointments_df[appointments_df['appointment_id'] == appointment_id]
-            
-            if appointment.empty:
+        # Parse query for reminder type and appointment ID; the first keyword in priority order wins
+        query_lower = query.lower()
+        reminder_type = next(
+            (reminder_type for keyword, reminder_type in REMINDER_TYPE_KEYWORDS.items() if keyword in query_lower),
+            None
+        )
+        if reminder_type is None:
+            return "❌ Please specify reminder type: regular, form_check, or confirmation"
+        
+        apt_match = APPOINTMENT_ID_PATTERN.search(query.upper())
+        if not apt_match:
+            return "❌ Please provide an appointment ID (e.g., APT_20250906_123456)"
+        
+        return self._send_typed_reminder(reminder_type, apt_match.group())
+    
+    def _send_typed_reminder(self, reminder_type: str, appointment_id: str) -> str:
+        """Send one reminder of the given type for an appointment"""
+        # Look up appointment and patient through the indexed SQLite cache
+        with closing(self._ensure_sqlite()) as conn:
+            appointment = conn.execute(
+                "SELECT * FROM appointments WHERE appointment_id = ?", (appointment_id,)
+            ).fetchone()
+            
+            if appointment is None:
                 return f"❌ Appointment {appointment_id} not found"
             
-            appointment_data = appointment.iloc[0]
+            appointment_data = dict(appointment)
             
             # Get patient data
-            patients_df = pd.read_csv(self.data_dir / "patients" / "patient_database.csv")
-            patient = patients_df[patients_df['patient_id'] == appointment_data['patient_id']]
+            patient = conn.execute(
+                "SELECT * FROM patients WHERE patient_id = ?", (appointment_data['patient_id'],)
+            ).fetchone()
             
-            if patient.empty:
+            if patient is None:
                 return f"❌ Patient {appointment_data['patient_id']} not found"
             
-            patient_data = patient.iloc[0]
-            
-            # Prepare combined data
-            combined_data = {
-                **appointment_data.to_dict(),
-                'patient_name': patient_data.get('full_name', f"{patient_data.get('first_name', '')} {patient_data.get('last_name', '')}").strip(),
-                'patient_email': patient_data.get('email', ''),
-                'patient_phone': patient_data.get('phone', ''),
-                'doctor_name': appointment_data.get('doctor_name', 'TBD')
-            }
-            
-            # Send reminder
-            email_success = False
-            sms_success = False
-            
-            if self.email_service and combined_data['patient_email']:
-                email_success = self.email_service.send_appointment_reminder(combined_data, reminder_type)
-            
-            if combined_data['patient_phone']:
-                sms_success = self.email_service.send_sms_reminder(combined_data, reminder_type) if self.email_service else True
-            
-            if email_success or sms_success:
-                return f"""
-✅ **Manual Reminder Sent**
-
-📅 Appointment: {appointment_id}
-👤 Patient: {combined_data['patient_name']}
-🔔 Type: {reminder_type.title()} reminder
-📧 Email: {'✅ Sent' if email_success else '❌ Failed/Not available'}
-📱 SMS: {'✅ Sent' if sms_success else '❌ Failed/Not available'}
-
-The patient has been notified about their upcoming appointment.
-"""
-            else:
-                return f"❌ Failed to send reminder - no valid contact methods available"
-                
-        except Exception as e:
-            return f"❌ Error sending manual reminder: {str(e)}"
+            patient_data = dict(patient)
+        
+        # Build only the fields the reminder templates read instead of copying every appointment column
+        full_name = str(patient_data.get('full_name') or '').strip()
+        patient_name = full_name or f"{patient_data.get('first_name') or ''} {patient_data.get('last_name') or ''}".strip()
+        
+        combined_data = {
+            'appointment_id': appointment_id,
+            'appointment_date': appointment_data.get('appointment_date') or 'TBD',
+            'appointment_time': appointment_data.get('appointment_time') or 'TBD',
+            'duration_minutes': appointment_data.get('duration_minutes') or 30,
+            'patient_type': appointment_data.get('patient_type') or '',
+            'doctor_name': appointment_data.get('doctor_name') or 'TBD',
+            'patient_name': patient_name,
+            'patient_email': patient_data.get('email') or '',
+            'patient_phone': patient_data.get('phone') or ''
+        }
+        
+        # Send reminder
+        email_success = False
+        sms_success = False
+        
+        if self.email_service and combined_data['patient_email']:
+            email_success = self.email_service.send_appointment_reminder(combined_data, reminder_type)
+        
+        if combined_data['patient_phone']:
+            sms_success = self.email_service.send_sms_reminder(combined_data, reminder_type) if self.email_service else True
+        
+        if email_success or sms_success:
+            return MANUAL_REMINDER_SENT_TEMPLATE.safe_substitute(
+                appointment_id=appointment_id,
+                patient_name=combined_data['patient_name'],
+                reminder_type=reminder_type.title(),
+                email_status='✅ Sent' if email_success else '❌ Failed/Not available',
+                sms_status='✅ Sent' if sms_success else '❌ Failed/Not available'
+            )
+        else:
+            return f"❌ Failed to send reminder - no valid contact methods available"
     
+    @requires_reminder_engine("processing patient response")
     def _process_patient_response(self, response_text: str) -> str:
         """Process patient response to reminders"""
-        try:
-            if not self.reminder_engine:
-                return "❌ Reminder system not available"
-            
-            # Extract patient ID or appointment ID from response if available
-            patient_id = None
-            reminder_type = None
-            
-            # Parse response for context
-            response_lower = response_text.lower()
-            
-            if "form" in response_lower:
-                reminder_type = "form_check"
-            elif "confirm" in response_lower or "cancel" in response_lower:
-                reminder_type = "confirmation"
-            
-            # For demo, use a placeholder patient ID
-            # In production, this would be linked to the actual responding patient
-            result = self.reminder_engine.process_patient_response("demo_patient", response_text, reminder_type)
-            
-            status_icons = {
-                "success": "✅",
-                "partial": "⚠️",
-                "error": "❌"
-            }
-            
-            icon = status_icons.get(result['status'], "ℹ️")
-            
-            response_message = f"""
-{icon} **Patient Response Processed**
-
-📝 Response: "{response_text}"
-🔄 Action: {result['action'].replace('_', ' ').title()}
-💬 Message: {result['message']}
-
-"""
-            
-            # Add next action information
-            next_action = result.get('next_action', 'none')
-            if next_action == 'staff_callback':
-                response_message += "📞 **Next Step:** Staff will call patient to assist\n"
-            elif next_action == 'resend_forms':
-                response_message += "📄 **Next Step:** Intake forms will be resent\n"
-            elif next_action == 'process_cancellation':
-                cancellation_reason = result.get('cancellation_reason', 'unspecified')
-                response_message += f"❌ **Next Step:** Process cancellation (Reason: {cancellation_reason})\n"
-            elif next_action == 'staff_reschedule':
-                response_message += "📅 **Next Step:** Staff will contact patient to reschedule\n"
-            elif next_action == 'staff_review':
-                response_message += "👥 **Next Step:** Staff will review and follow up\n"
-            
-            return response_message
-            
-        except Exception as e:
-            return f"❌ Error processing patient response: {str(e)}"
+        reminder_type = None
+        
+        # Parse response for context
+        response_lower = response_text.lower()
+        
+        if "form" in response_lower:
+            reminder_type = "form_check"
+        elif "confirm" in response_lower or "cancel" in response_lower:
+            reminder_type = "confirmation"
+        
+        # For demo, use a placeholder patient ID
+        # In production, this would be linked to the actual responding patient
+        result = self.reminder_engine.process_patient_response("demo_patient", response_text, reminder_type)
+        
+        status_icons = {
+            "success": "✅",
+            "partial": "⚠️",
+            "error": "❌"
+        }
+        
+        icon = status_icons.get(result['status'], "ℹ️")
+        
+        response_message = PATIENT_RESPONSE_TEMPLATE.safe_substitute(
+            icon=icon,
+            response_text=response_text,
+            action=result['action'].replace('_', ' ').title(),
+            message=result['message']
+        )
+        
+        # Add next action information
+        next_action = result.get('next_action', 'none')
+        if next_action == 'staff_callback':
+            response_message += "📞 **Next Step:** Staff will call patient to assist\n"
+        elif next_action == 'resend_forms':
+            response_message += "📄 **Next Step:** Intake forms will be resent\n"
+        elif next_action == 'process_cancellation':
+            cancellation_reason = result.get('cancellation_reason', 'unspecified')
+            response_message += f"❌ **Next Step:** Process cancellation (Reason: {cancellation_reason})\n"
+        elif next_action == 'staff_reschedule':
+            response_message += "📅 **Next Step:** Staff will contact patient to reschedule\n"
+        elif next_action == 'staff_review':
+            response_message += "👥 **Next Step:** Staff will review and follow up\n"
+        
+        return response_message
     
+    @requires_reminder_engine("running reminder system")
     def _run_reminder_system(self, query: str = "") -> str:
         """Check and send all due reminders"""
-        try:
-            if not self.reminder_engine:
-                return "❌ Reminder system not available"
-            
-            result = self.reminder_engine.check_and_send_due_reminders()
-            
-            sent = result.get('sent', [])
-            failed = result.get('failed', [])
-            skipped = result.get('skipped', [])
-            
-            summary = f"""
-🔄 **Reminder System Run Complete**
-
-📊 **Results:**
-- ✅ Sent: {len(sent)}
-- ❌ Failed: {len(failed)}
-- ⚠️ Skipped: {len(skipped)}
-
-"""
-            
-            if sent:
-                summary += "✅ **Successfully Sent:**\n"
-                for reminder in sent[:5]:  # Show first 5
-                    summary += f"  • {reminder['type'].title()} to {reminder['patient']} via {reminder['method']}\n"
-                if len(sent) > 5:
-                    summary += f"  • ...and {len(sent) - 5} more\n"
-                summary += "\n"
-            
-            if failed:
-                summary += "❌ **Failed to Send:**\n"
-                for reminder in failed[:3]:  # Show first 3
-                    summary += f"  • {reminder['type'].title()} - {reminder.get('reason', 'Unknown error')}\n"
-                if len(failed) > 3:
-                    summary += f"  • ...and {len(failed) - 3} more\n"
-                summary += "\n"
-            
-            if not sent and not failed and not skipped:
-                summary += "ℹ️ No reminders were due at this time.\n"
-            
-            return summary
-            
-        except Exception as e:
-            return f"❌ Error running reminder system: {str(e)}"
+        result = self.reminder_engine.check_and_send_due_reminders()
+        
+        sent = result.get('sent', [])
+        failed = result.get('failed', [])
+        skipped = result.get('skipped', [])
+        
+        summary = REMINDER_RUN_SUMMARY_TEMPLATE.safe_substitute(
+            sent=len(sent),
+            failed=len(failed),
+            skipped=len(skipped)
+        )
+        
+        if sent:
+            summary += "✅ **Successfully Sent:**\n"
+            for reminder in sent[:5]:  # Show first 5
+                summary += f"  • {reminder['type'].title()} to {reminder['patient']} via {reminder['method']}\n"
+            if len(sent) > 5:
+                summary += f"  • ...and {len(sent) - 5} more\n"
+            summary += "\n"
+        
+        if failed:
+            summary += "❌ **Failed to Send:**\n"
+            for reminder in failed[:3]:  # Show first 3
+                summary += f"  • {reminder['type'].title()} - {reminder.get('reason', 'Unknown error')}\n"
+            if len(failed) > 3:
+                summary += f"  • ...and {len(failed) - 3} more\n"
+            summary += "\n"
+        
+        if not sent and not failed and not skipped:
+            summary += "ℹ️ No reminders were due at this time.\n"
+        
+        return summary
     
     def _configure_sms_service(self, query: str = "") -> str:
         """Get SMS service configuration and setup instructions"""
@@ -2341,53 +2493,10 @@ The patient has been notified about their upcoming appointment.
             else:
                 provider_instructions = instructions
             
-            return f"""
-📱 **SMS Service Configuration**
-
-🔧 **Current Status:** {recommended.upper()} mode
-
-{provider_instructions}
-
-🚀 **Quick Start for Real SMS:**
-
-**Option 1: Twilio (Recommended)**
-```bash
-# Install Twilio
-pip install twilio
-
-# Set environment variables (replace with your values)
-export TWILIO_ACCOUNT_SID="your_account_sid_here"
-export TWILIO_AUTH_TOKEN="your_auth_token_here"  
-export TWILIO_PHONE_NUMBER="+1234567890"
-
-# Restart the application
-```
-
-**Option 2: AWS SNS**
-```bash
-# Install boto3
-pip install boto3
-
-# Configure AWS credentials
-aws configure
-# OR set environment variables:
-export AWS_ACCESS_KEY_ID="your_access_key"
-export AWS_SECRET_ACCESS_KEY="your_secret_key"
-export AWS_DEFAULT_REGION="us-east-1"
-
-# Restart the application
-```
-
-📊 **SMS Usage Statistics:**
-- Current mode: Simulated (no cost, perfect for testing)
-- Real SMS cost: ~$0.0075 per message
-- Supported features: Delivery confirmations, status tracking
-
-💡 **Need Help?** 
-- Ask me: "How do I set up Twilio SMS?"
-- Ask me: "Show AWS SNS setup instructions"
-- Visit: https://docs.twilio.com/ or https://docs.aws.amazon.com/sns/
-"""
+            return SMS_CONFIGURATION_TEMPLATE.safe_substitute(
+                provider=recommended.upper(),
+                provider_instructions=provider_instructions
+            )
             
         except Exception as e:
             return f"❌ Error getting SMS configuration: {str(e)}"
@@ -2,96 +2,144 @@
 Email Templates for Appointment Management System
 """
 
+import functools
+import re
+import string
 from datetime import datetime, timedelta
-from typing import Dict, Optional
+from typing import Dict, NamedTuple, Optional, Tuple, TypedDict
+
+# NOTE: do not wrap these templates with numba.jit. Numba's object-mode string
+# handling is slower than plain CPython for this kind of formatting.
+
+
+class RenderedEmail(NamedTuple):
+    """Subject and body of a rendered email"""
+    subject: str
+    body: str
+
+
+# Fallback values for fields missing from the appointment/patient data,
+# merged under the caller's data in a single dict build per render.
+# Clinic fields are bound into each instance's templates up front
+_REMINDER_PLACEHOLDERS = {
+    "patient_name": "Patient",
+    "appointment_date": "TBD",
+    "appointment_time": "TBD",
+    "doctor_name": "TBD",
+    "duration_minutes": 30,
+    "appointment_id": "N/A",
+    "patient_type": ""
+}
+
+
+class AppointmentTD(TypedDict, total=True):
+    """Appointment fields read by the reminder templates"""
+    patient_name: str
+    appointment_date: str
+    appointment_time: str
+    doctor_name: str
+    duration_minutes: int
+    appointment_id: str
+    patient_type: str
+
+
+_INTAKE_PLACEHOLDERS = {
+    "first_name": "Patient",
+    "appointment_date": "TBD",
+    "appointment_time": "TBD",
+    "doctor_name": "TBD",
+    "intake_form_link": "Link provided in previous email"
+}
+
+_CONFIRMATION_WITH_INTAKE_PLACEHOLDERS = {
+    **_INTAKE_PLACEHOLDERS,
+    "clinic_address": "Main Office",
+    "intake_form_link": "Link will be provided separately",
+    "patient_portal_link": "Available through patient portal"
+}
+
+# How the regular reminder refers to the appointment for each send offset
+_TIMING_TEXT = {
+    "24h": "tomorrow",
+    "4h": "in 4 hours",
+    "1h": "in 1 hour"
+}
+
+# Check-in line of the regular reminder, keyed by "is a new patient"
+_INTAKE_LINE = {
+    True: "✅ Complete intake forms (new patients)",
+    False: "✅ Brief check-in (returning patients)"
+}
+
+# Templates are split into static text and placeholders once, on first render
+_REGULAR_REMINDER_SUBJECT = "📅 Appointment Reminder - {timing_title} | {clinic_name}"
+_FORM_COMPLETION_SUBJECT = "📋 Have you completed your intake forms? | {clinic_name}"
+_VISIT_CONFIRMATION_SUBJECT = "🔔 Final Reminder - Confirm or Cancel Your Appointment | {clinic_name}"
+_CONFIRMATION_WITH_INTAKE_SUBJECT = "Appointment Confirmed - Please Complete Intake Form | {clinic_name}"
+_INTAKE_REMINDER_SUBJECT = "Reminder: Complete Your Intake Form Before Your Appointment"
+_INTAKE_RECEIVED_SUBJECT = "Intake Form Received - You're All Set!"
+_INTAKE_INCOMPLETE_SUBJECT = "Action Required: Complete Your Intake Form"
+_INTAKE_FOLLOWUP_SUBJECT = "Follow-up Questions About Your Intake Form"
+
+# Blocks shared by several bodies
+_REMINDER_APPOINTMENT_LINES = """📅 Date: {appointment_date}
+🕐 Time: {appointment_time}
+👨‍⚕️ Provider: Dr. {doctor_name}"""
+
+_INTAKE_APPOINTMENT_LINES = """📅 Date: {appointment_date}
+🕐 Time: {appointment_time}
+👨‍⚕️ Provider: {doctor_name}"""
+
+_SIGN_OFF = """Best regards,
+{clinic_name} Team
+"""
 
 
-class AppointmentReminderTemplates:
-    """Email and SMS templates for appointment reminders"""
-    
-    def __init__(self, clinic_name: str = "Medical Clinic", clinic_phone: str = "(555) 123-4567"):
-        self.clinic_name = clinic_name
-        self.clinic_phone = clinic_phone
-    
-    def regular_appointment_reminder(self, appointment_data: Dict, reminder_timing: str = "24h") -> Dict[str, str]:
-        """
-        Regular appointment reminder template
-        
-        Args:
-            appointment_data: Dictionary containing appointment information
-            reminder_timing: When this reminder is sent (24h, 4h, 1h)
-            
-        Returns:
-            Dictionary with email subject and body
-        """
-        timing_text = {
-            "24h": "tomorrow",
-            "4h": "in 4 hours", 
-            "1h": "in 1 hour"
-        }.get(reminder_timing, "soon")
-        
-        subject = f"📅 Appointment Reminder - {timing_text.title()} | {self.clinic_name}"
-        
-        body = f"""
+def _automated_footer(kind: str) -> str:
+    """No-reply footer for automated intake emails"""
+    return f"---\nThis is an automated {kind}. Please do not reply to this email."
+
+
+_REGULAR_REMINDER_BODY = """
 🏥 **APPOINTMENT REMINDER**
 
-Dear {appointment_data.get('patient_name', 'Patient')},
+Dear {patient_name},
 
 This is a friendly reminder about your upcoming appointment {timing_text}.
 
 **APPOINTMENT DETAILS:**
-📅 Date: {appointment_data.get('appointment_date', 'TBD')}
-🕐 Time: {appointment_data.get('appointment_time', 'TBD')}
-👨‍⚕️ Provider: Dr. {appointment_data.get('doctor_name', 'TBD')}
-⏱️ Duration: {appointment_data.get('duration_minutes', 30)} minutes
-📍 Location: {self.clinic_name} - Main Office
-🆔 Appointment ID: {appointment_data.get('appointment_id', 'N/A')}
+""" + _REMINDER_APPOINTMENT_LINES + """
+⏱️ Duration: {duration_minutes} minutes
+📍 Location: {clinic_name} - Main Office
+🆔 Appointment ID: {appointment_id}
 
 **PREPARATION CHECKLIST:**
 ✅ Bring photo ID and insurance card
 ✅ List of current medications
 ✅ Arrive 15 minutes early for check-in
-{'✅ Complete intake forms (new patients)' if appointment_data.get('patient_type') == 'New Patient' else '✅ Brief check-in (returning patients)'}
+{intake_line}
 
 **NEED TO RESCHEDULE?**
-📞 Call us: {self.clinic_phone}
+📞 Call us: {clinic_phone}
 ⏰ At least 24 hours notice required
 
 **CONTACT INFO:**
-📞 Main Office: {self.clinic_phone}
-🚨 Emergency: (555) 999-8888
+📞 Main Office: {clinic_phone}
+🚨 Emergency: {emergency_phone}
 
 We look forward to seeing you {timing_text}!
 
-Best regards,
-{self.clinic_name} Team
-"""
-        
-        return {"subject": subject, "body": body}
-    
-    def form_completion_reminder(self, appointment_data: Dict) -> Dict[str, str]:
-        """
-        Reminder asking if intake forms have been completed
-        
-        Args:
-            appointment_data: Dictionary containing appointment information
-            
-        Returns:
-            Dictionary with email subject and body
-        """
-        subject = f"📋 Have you completed your intake forms? | {self.clinic_name}"
-        
-        body = f"""
+""" + _SIGN_OFF
+
+_FORM_COMPLETION_BODY = """
 🏥 **INTAKE FORM COMPLETION CHECK**
 
-Dear {appointment_data.get('patient_name', 'Patient')},
+Dear {patient_name},
 
 Your appointment is coming up soon! We want to make sure everything is ready for your visit.
 
 **YOUR UPCOMING APPOINTMENT:**
-📅 Date: {appointment_data.get('appointment_date', 'TBD')}
-🕐 Time: {appointment_data.get('appointment_time', 'TBD')}
-👨‍⚕️ Provider: Dr. {appointment_data.get('doctor_name', 'TBD')}
+""" + _REMINDER_APPOINTMENT_LINES + """
 
 **INTAKE FORM STATUS CHECK:**
 Have you completed your new patient intake forms yet?
@@ -111,7 +159,7 @@ No worries! You can:
 🏥 At Office: Arrive early and we'll help you complete them
 
 **NEED HELP?**
-📞 Call us: {self.clinic_phone}
+📞 Call us: {clinic_phone}
 💬 Text: Reply to this message
 
 **REPLY TO THIS MESSAGE:**
@@ -121,36 +169,20 @@ No worries! You can:
 
 We want to ensure your appointment runs smoothly and on time!
 
-Best regards,
-{self.clinic_name} Team
-"""
-        
-        return {"subject": subject, "body": body}
-    
-    def visit_confirmation_reminder(self, appointment_data: Dict) -> Dict[str, str]:
-        """
-        Final reminder asking for visit confirmation or cancellation reason
-        
-        Args:
-            appointment_data: Dictionary containing appointment information
-            
-        Returns:
-            Dictionary with email subject and body
-        """
-        subject = f"🔔 Final Reminder - Confirm or Cancel Your Appointment | {self.clinic_name}"
-        
-        body = f"""
+""" + _SIGN_OFF
+
+_VISIT_CONFIRMATION_BODY = """
 🏥 **FINAL APPOINTMENT CONFIRMATION**
 
-Dear {appointment_data.get('patient_name', 'Patient')},
+Dear {patient_name},
 
 Your appointment is scheduled for very soon. Please confirm your attendance or let us know if you need to cancel.
 
 **YOUR APPOINTMENT:**
-📅 **TODAY** - {appointment_data.get('appointment_date', 'TBD')}
-🕐 Time: {appointment_data.get('appointment_time', 'TBD')}
-👨‍⚕️ Provider: Dr. {appointment_data.get('doctor_name', 'TBD')}
-📍 Location: {self.clinic_name} - Main Office
+📅 **TODAY** - {appointment_date}
+🕐 Time: {appointment_time}
+👨‍⚕️ Provider: Dr. {doctor_name}
+📍 Location: {clinic_name} - Main Office
 
 **⚠️ IMPORTANT - PLEASE RESPOND:**
 
@@ -168,127 +200,37 @@ Your appointment is scheduled for very soon. Please confirm your attendance or l
 
 **📅 NEED TO RESCHEDULE?**
 • Reply "RESCHEDULE" and we'll help you find a new time
-• Call us at {self.clinic_phone}
+• Call us at {clinic_phone}
 
 **⏰ LAST-MINUTE CHANGES:**
 If you need to cancel within 2 hours of your appointment, please call us directly:
-📞 {self.clinic_phone}
+📞 {clinic_phone}
 
 **CONTACT OPTIONS:**
-📞 Call: {self.clinic_phone}
+📞 Call: {clinic_phone}
 💬 Text: Reply to this message
-🚨 Emergency: (555) 999-8888
+🚨 Emergency: {emergency_phone}
 
 **NO RESPONSE?**
 If we don't hear from you, we'll assume you're coming and will hold your appointment slot.
 
 We appreciate your timely response!
 
-Best regards,
-{self.clinic_name} Team
-"""
-        
-        return {"subject": subject, "body": body}
-    
-    def sms_templates(self, appointment_data: Dict, reminder_type: str) -> str:
-        """
-        SMS templates for different reminder types
-        
-        Args:
-            appointment_data: Dictionary containing appointment information
-            reminder_type: Type of reminder (regular, form_check, confirmation)
-            
-        Returns:
-            SMS message text
-        """
-        if reminder_type == "regular":
-            return f"""
-🏥 {self.clinic_name}
+""" + _SIGN_OFF
 
-Appointment Reminder:
-📅 {appointment_data.get('appointment_date', 'TBD')}
-🕐 {appointment_data.get('appointment_time', 'TBD')}
-👨‍⚕️ Dr. {appointment_data.get('doctor_name', 'TBD')}
+_CONFIRMATION_WITH_INTAKE_BODY = """Dear {first_name},
 
-Arrive 15 min early. Bring ID & insurance.
-Call {self.clinic_phone} to reschedule.
-
-ID: {appointment_data.get('appointment_id', 'N/A')[-6:]}
-Reply STOP to opt out.
-"""
-        
-        elif reminder_type == "form_check":
-            return f"""
-🏥 {self.clinic_name}
-
-Have you completed your intake forms?
-
-📅 Appointment: {appointment_data.get('appointment_date', 'TBD')} at {appointment_data.get('appointment_time', 'TBD')}
-
-Reply:
-• COMPLETED - if forms are done
-• HELP - need assistance
-• PRINT - resend forms
-
-Call: {self.clinic_phone}
-Reply STOP to opt out.
-"""
-        
-        elif reminder_type == "confirmation":
-            return f"""
-🏥 {self.clinic_name}
-
-FINAL REMINDER
-📅 TODAY: {appointment_data.get('appointment_date', 'TBD')}
-🕐 {appointment_data.get('appointment_time', 'TBD')}
-
-Reply:
-• CONFIRM - I'm coming
-• CANCEL - Can't make it
-• RESCHEDULE - Need new time
-
-Call: {self.clinic_phone}
-Reply STOP to opt out.
-"""
-        
-        return "Appointment reminder from " + self.clinic_name
-
-
-class IntakeFormEmailTemplates:
-    """Email templates for sending intake forms to patients"""
-    
-    def __init__(self, clinic_name: str = "Medical Clinic", clinic_phone: str = "(555) 123-4567"):
-        self.clinic_name = clinic_name
-        self.clinic_phone = clinic_phone
-    
-    def appointment_confirmation_with_intake_form(self, patient_data: Dict) -> Dict[str, str]:
-        """
-        Email template for appointment confirmation with intake form
-        
-        Args:
-            patient_data: Dictionary containing patient and appointment information
-            
-        Returns:
-            Dictionary with email subject and body
-        """
-        subject = f"Appointment Confirmed - Please Complete Intake Form | {self.clinic_name}"
-        
-        body = f"""
-Dear {patient_data.get('first_name', 'Patient')},
-
-Thank you for scheduling your appointment with {self.clinic_name}. We are pleased to confirm your upcoming visit.
+Thank you for scheduling your appointment with {clinic_name}. We are pleased to confirm your upcoming visit.
 
 APPOINTMENT DETAILS:
-📅 Date: {patient_data.get('appointment_date', 'TBD')}
-🕐 Time: {patient_data.get('appointment_time', 'TBD')}
-👨‍⚕️ Provider: {patient_data.get('doctor_name', 'TBD')}
-📍 Location: {patient_data.get('clinic_address', 'Main Office')}
+""" + _INTAKE_APPOINTMENT_LINES + """
+📍 Location: {clinic_address}
 
 IMPORTANT: COMPLETE YOUR INTAKE FORM
 To ensure your appointment runs smoothly and on time, please complete your new patient intake form before your visit.
 
 🔗 COMPLETE ONLINE INTAKE FORM: 
-{patient_data.get('intake_form_link', 'Link will be provided separately')}
+{intake_form_link}
 
 📋 ALTERNATIVE - DOWNLOAD PRINTABLE FORM:
 If the online form link doesn't work, you can download and print the intake form from our local system.
@@ -296,7 +238,7 @@ If the online form link doesn't work, you can download and print the intake form
 ALTERNATIVE OPTIONS:
 • Print and complete the attached form, bring it to your appointment
 • Arrive 15 minutes early to complete the form at our office
-• Call us at {self.clinic_phone} if you need assistance accessing the form
+• Call us at {clinic_phone} if you need assistance accessing the form
 
 WHAT TO BRING:
 ✅ Photo ID (driver's license or state ID)
@@ -313,53 +255,28 @@ We will send you reminder notifications via your preferred contact method:
 
 NEED TO RESCHEDULE?
 If you need to reschedule or cancel your appointment, please contact us at least 24 hours in advance:
-📞 Phone: {self.clinic_phone}
-💻 Online: {patient_data.get('patient_portal_link', 'Available through patient portal')}
+📞 Phone: {clinic_phone}
+💻 Online: {patient_portal_link}
 
 QUESTIONS?
-If you have any questions about your appointment or the intake form, please don't hesitate to contact us at {self.clinic_phone}.
+If you have any questions about your appointment or the intake form, please don't hesitate to contact us at {clinic_phone}.
 
 We look forward to providing you with excellent healthcare services!
 
-Best regards,
-{self.clinic_name} Team
+""" + _SIGN_OFF + "\n" + _automated_footer("message") + """
+For urgent medical matters, please call {clinic_phone} or visit the nearest emergency room."""
 
----
-This is an automated message. Please do not reply to this email.
-For urgent medical matters, please call {self.clinic_phone} or visit the nearest emergency room.
-"""
-        
-        return {
-            "subject": subject,
-            "body": body.strip()
-        }
-    
-    def intake_form_reminder(self, patient_data: Dict) -> Dict[str, str]:
-        """
-        Email template for intake form completion reminder
-        
-        Args:
-            patient_data: Dictionary containing patient information
-            
-        Returns:
-            Dictionary with email subject and body
-        """
-        subject = f"Reminder: Complete Your Intake Form Before Your Appointment"
-        
-        body = f"""
-Dear {patient_data.get('first_name', 'Patient')},
+_INTAKE_REMINDER_BODY = """Dear {first_name},
 
-This is a friendly reminder that your appointment with {self.clinic_name} is approaching, and we have not yet received your completed intake form.
+This is a friendly reminder that your appointment with {clinic_name} is approaching, and we have not yet received your completed intake form.
 
 UPCOMING APPOINTMENT:
-📅 Date: {patient_data.get('appointment_date', 'TBD')}
-🕐 Time: {patient_data.get('appointment_time', 'TBD')}
-👨‍⚕️ Provider: {patient_data.get('doctor_name', 'TBD')}
+""" + _INTAKE_APPOINTMENT_LINES + """
 
 COMPLETE YOUR INTAKE FORM:
 To ensure your appointment starts on time and we can provide you with the best possible care, please complete your intake form as soon as possible.
 
-🔗 COMPLETE ONLINE: {patient_data.get('intake_form_link', 'Link provided in previous email')}
+🔗 COMPLETE ONLINE: {intake_form_link}
 
 ALTERNATIVE OPTIONS:
 • Download and print the form from our website
@@ -372,43 +289,18 @@ WHY IT'S IMPORTANT:
 ✅ Facilitates insurance processing
 
 NEED HELP?
-If you're having trouble accessing or completing the form, please call us at {self.clinic_phone}. Our staff is happy to assist you.
+If you're having trouble accessing or completing the form, please call us at {clinic_phone}. Our staff is happy to assist you.
 
 Thank you for your cooperation!
 
-Best regards,
-{self.clinic_name} Team
+""" + _SIGN_OFF + "\n" + _automated_footer("reminder")
 
----
-This is an automated reminder. Please do not reply to this email.
-"""
-        
-        return {
-            "subject": subject,
-            "body": body.strip()
-        }
-    
-    def intake_form_received_confirmation(self, patient_data: Dict) -> Dict[str, str]:
-        """
-        Email template confirming intake form has been received
-        
-        Args:
-            patient_data: Dictionary containing patient information
-            
-        Returns:
-            Dictionary with email subject and body
-        """
-        subject = f"Intake Form Received - You're All Set!"
-        
-        body = f"""
-Dear {patient_data.get('first_name', 'Patient')},
+_INTAKE_RECEIVED_BODY = """Dear {first_name},
 
 Thank you! We have successfully received your completed intake form.
 
 APPOINTMENT DETAILS:
-📅 Date: {patient_data.get('appointment_date', 'TBD')}
-🕐 Time: {patient_data.get('appointment_time', 'TBD')}
-👨‍⚕️ Provider: {patient_data.get('doctor_name', 'TBD')}
+""" + _INTAKE_APPOINTMENT_LINES + """
 
 YOU'RE ALL SET!
 ✅ Intake form completed and received
@@ -430,39 +322,13 @@ STILL NEED TO BRING:
 💳 Payment method for copay/deductible
 
 QUESTIONS?
-If you have any questions before your appointment, please contact us at {self.clinic_phone}.
+If you have any questions before your appointment, please contact us at {clinic_phone}.
 
 We look forward to seeing you soon!
 
-Best regards,
-{self.clinic_name} Team
+""" + _SIGN_OFF + "\n" + _automated_footer("confirmation")
 
----
-This is an automated confirmation. Please do not reply to this email.
-"""
-        
-        return {
-            "subject": subject,
-            "body": body.strip()
-        }
-    
-    def intake_form_incomplete_notification(self, patient_data: Dict, missing_fields: list) -> Dict[str, str]:
-        """
-        Email template for incomplete intake form notification
-        
-        Args:
-            patient_data: Dictionary containing patient information
-            missing_fields: List of missing required fields
-            
-        Returns:
-            Dictionary with email subject and body
-        """
-        subject = f"Action Required: Complete Your Intake Form"
-        
-        missing_items = "\n".join([f"• {field}" for field in missing_fields])
-        
-        body = f"""
-Dear {patient_data.get('first_name', 'Patient')},
+_INTAKE_INCOMPLETE_BODY = """Dear {first_name},
 
 We received your intake form submission, but it appears some required information is missing. To ensure we can provide you with the best care during your appointment, please complete the following:
 
@@ -470,52 +336,24 @@ MISSING INFORMATION:
 {missing_items}
 
 UPCOMING APPOINTMENT:
-📅 Date: {patient_data.get('appointment_date', 'TBD')}
-🕐 Time: {patient_data.get('appointment_time', 'TBD')}
-👨‍⚕️ Provider: {patient_data.get('doctor_name', 'TBD')}
+""" + _INTAKE_APPOINTMENT_LINES + """
 
 COMPLETE YOUR FORM:
-🔗 Access your form: {patient_data.get('intake_form_link', 'Link provided in previous email')}
+🔗 Access your form: {intake_form_link}
 
 Your partially completed information has been saved. Simply click the link above to finish where you left off.
 
 NEED ASSISTANCE?
-If you're having trouble completing the form or have questions about any of the required fields, please call us at {self.clinic_phone}. Our staff is ready to help!
+If you're having trouble completing the form or have questions about any of the required fields, please call us at {clinic_phone}. Our staff is ready to help!
 
 IMPORTANT:
 Please complete the missing information at least 24 hours before your appointment to ensure we have adequate time to review your information.
 
 Thank you for your prompt attention to this matter.
 
-Best regards,
-{self.clinic_name} Team
+""" + _SIGN_OFF + "\n" + _automated_footer("notification")
 
----
-This is an automated notification. Please do not reply to this email.
-"""
-        
-        return {
-            "subject": subject,
-            "body": body.strip()
-        }
-    
-    def intake_form_followup_questions(self, patient_data: Dict, questions: list) -> Dict[str, str]:
-        """
-        Email template for follow-up questions about intake form
-        
-        Args:
-            patient_data: Dictionary containing patient information
-            questions: List of follow-up questions from medical staff
-            
-        Returns:
-            Dictionary with email subject and body
-        """
-        subject = f"Follow-up Questions About Your Intake Form"
-        
-        question_list = "\n".join([f"{i+1}. {q}" for i, q in enumerate(questions)])
-        
-        body = f"""
-Dear {patient_data.get('first_name', 'Patient')},
+_INTAKE_FOLLOWUP_BODY = """Dear {first_name},
 
 Thank you for submitting your intake form. Our medical team has reviewed your information and has a few follow-up questions to ensure we provide you with the best possible care.
 
@@ -523,12 +361,10 @@ FOLLOW-UP QUESTIONS:
 {question_list}
 
 UPCOMING APPOINTMENT:
-📅 Date: {patient_data.get('appointment_date', 'TBD')}
-🕐 Time: {patient_data.get('appointment_time', 'TBD')}
-👨‍⚕️ Provider: {patient_data.get('doctor_name', 'TBD')}
+""" + _INTAKE_APPOINTMENT_LINES + """
 
 HOW TO RESPOND:
-Please reply to this email with your answers, or call us at {self.clinic_phone} to discuss these questions with our medical staff.
+Please reply to this email with your answers, or call us at {clinic_phone} to discuss these questions with our medical staff.
 
 TIMING:
 We would appreciate receiving your responses at least 24 hours before your appointment so our provider can adequately prepare for your visit.
@@ -536,43 +372,407 @@ We would appreciate receiving your responses at least 24 hours before your appoi
 Thank you for your cooperation in helping us provide you with excellent care!
 
 Best regards,
-{self.clinic_name} Medical Team
+{clinic_name} Medical Team
 
 ---
-You may reply to this email or call {self.clinic_phone} for any questions.
+You may reply to this email or call {clinic_phone} for any questions."""
+
+
+# SMS bodies by reminder type; clinic fields are bound per instance
+_SMS_TEMPLATES = {
+    "regular": """
+🏥 {clinic_name}
+
+Appointment Reminder:
+📅 {appointment_date}
+🕐 {appointment_time}
+👨‍⚕️ Dr. {doctor_name}
+
+Arrive 15 min early. Bring ID & insurance.
+Call {clinic_phone} to reschedule.
+
+ID: {id6}
+Reply STOP to opt out.
+""",
+    "form_check": """
+🏥 {clinic_name}
+
+Have you completed your intake forms?
+
+📅 Appointment: {appointment_date} at {appointment_time}
+
+Reply:
+• COMPLETED - if forms are done
+• HELP - need assistance
+• PRINT - resend forms
+
+Call: {clinic_phone}
+Reply STOP to opt out.
+""",
+    "confirmation": """
+🏥 {clinic_name}
+
+FINAL REMINDER
+📅 TODAY: {appointment_date}
+🕐 {appointment_time}
+
+Reply:
+• CONFIRM - I'm coming
+• CANCEL - Can't make it
+• RESCHEDULE - Need new time
+
+Call: {clinic_phone}
+Reply STOP to opt out.
 """
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _compile_template(template: str) -> Tuple[Tuple[str, ...], Tuple]:
+    """
+    Split a template into its static text and placeholder slots
+    
+    Args:
+        template: Module-level format string with plain {name} placeholders
+        
+    Returns:
+        Tuple of (field names, parts) where each part is either literal text
+        or the index of a field name
+    """
+    names = {}
+    parts = []
+    for literal, name, format_spec, conversion in string.Formatter().parse(template):
+        if literal:
+            parts.append(literal)
+        if name is not None:
+            if format_spec or conversion:
+                raise ValueError(f"Unsupported placeholder in template: {{{name}}}")
+            parts.append(names.setdefault(name, len(names)))
+    return tuple(names), tuple(parts)
+
+
+_PLACEHOLDER_PATTERN = re.compile(r"\{(\w+)\}")
+
+
+def _bind_fields(template: str, bound: Dict) -> str:
+    """Substitute fixed values into a template, leaving the other placeholders in place"""
+    def substitute(match):
+        name = match.group(1)
+        if name not in bound:
+            return match.group(0)
+        return str(bound[name]).replace("{", "{{").replace("}", "}}")
+    
+    return _PLACEHOLDER_PATTERN.sub(substitute, template)
+
+
+def _join_parts(parts: Tuple, values) -> str:
+    """Fill the placeholder slots of a compiled template in a single join"""
+    return "".join(part if part.__class__ is str else str(values[part]) for part in parts)
+
+
+def _render(template: str, fields) -> str:
+    """
+    Render a template in a single join over its compiled parts
+    
+    Args:
+        template: Module-level format string
+        fields: Mapping with every placeholder the template reads
         
-        return {
-            "subject": subject,
-            "body": body.strip()
+    Returns:
+        Rendered text
+    """
+    names, parts = _compile_template(template)
+    return _join_parts(parts, [fields[name] for name in names])
+
+
+class AppointmentReminderTemplates:
+    """Email and SMS templates for appointment reminders"""
+    
+    def __init__(self, clinic_name: str = "Medical Clinic", clinic_phone: str = "(555) 123-4567",
+                 emergency_phone: str = "(555) 999-8888"):
+        self.clinic_name = clinic_name
+        self.clinic_phone = clinic_phone
+        self.emergency_phone = emergency_phone
+        self._clinic_fields = {
+            "clinic_name": clinic_name,
+            "clinic_phone": clinic_phone,
+            "emergency_phone": emergency_phone
+        }
+        
+        # Templates with the clinic fields already filled in, keyed by the module template
+        self._bound = {
+            template: _bind_fields(template, self._clinic_fields)
+            for template in (
+                _REGULAR_REMINDER_SUBJECT, _REGULAR_REMINDER_BODY,
+                _FORM_COMPLETION_SUBJECT, _FORM_COMPLETION_BODY,
+                _VISIT_CONFIRMATION_SUBJECT, _VISIT_CONFIRMATION_BODY
+            )
         }
+        self._sms_templates = {
+            reminder_type: _bind_fields(template, self._clinic_fields)
+            for reminder_type, template in _SMS_TEMPLATES.items()
+        }
+        
+        # Reminder type -> builder, so callers dispatch with one dict lookup
+        self._email_builders = {
+            "regular": self.regular_appointment_reminder,
+            "form_check": lambda appointment_data, reminder_timing: self.form_completion_reminder(appointment_data),
+            "confirmation": lambda appointment_data, reminder_timing: self.visit_confirmation_reminder(appointment_data)
+        }
+        self._sms_builders = {
+            "regular": self._sms_regular,
+            "form_check": self._sms_form_check,
+            "confirmation": self._sms_confirmation
+        }
+    
+    def build(self, reminder_type: str, appointment_data: AppointmentTD, reminder_timing: str = "24h") -> Optional[RenderedEmail]:
+        """
+        Build the reminder email for a reminder type
+        
+        Args:
+            reminder_type: Type of reminder (regular, form_check, confirmation)
+            appointment_data: Dictionary containing appointment information
+            reminder_timing: When a regular reminder is sent (24h, 4h, 1h)
+            
+        Returns:
+            RenderedEmail with subject and body, or None for an unknown type
+        """
+        builder = self._email_builders.get(reminder_type)
+        if builder is None:
+            return None
+        return builder(appointment_data, reminder_timing)
+    
+    def regular_appointment_reminder(self, appointment_data: AppointmentTD, reminder_timing: str = "24h") -> RenderedEmail:
+        """
+        Regular appointment reminder template
+        
+        Args:
+            appointment_data: Dictionary containing appointment information
+            reminder_timing: When this reminder is sent (24h, 4h, 1h)
+            
+        Returns:
+            RenderedEmail with subject and body
+        """
+        timing_text = _TIMING_TEXT.get(reminder_timing, "soon")
+        
+        fields = {**_REMINDER_PLACEHOLDERS, **appointment_data}
+        fields["timing_text"] = timing_text
+        fields["timing_title"] = timing_text.title()
+        fields["intake_line"] = _INTAKE_LINE[fields["patient_type"] == 'New Patient']
+        
+        subject = _render(self._bound[_REGULAR_REMINDER_SUBJECT], fields)
+        body = _render(self._bound[_REGULAR_REMINDER_BODY], fields)
+        
+        return RenderedEmail(subject, body)
+    
+    def form_completion_reminder(self, appointment_data: AppointmentTD) -> RenderedEmail:
+        """
+        Reminder asking if intake forms have been completed
+        
+        Args:
+            appointment_data: Dictionary containing appointment information
+            
+        Returns:
+            RenderedEmail with subject and body
+        """
+        fields = {**_REMINDER_PLACEHOLDERS, **appointment_data}
+        
+        subject = _render(self._bound[_FORM_COMPLETION_SUBJECT], fields)
+        body = _render(self._bound[_FORM_COMPLETION_BODY], fields)
+        
+        return RenderedEmail(subject, body)
+    
+    def visit_confirmation_reminder(self, appointment_data: AppointmentTD) -> RenderedEmail:
+        """
+        Final reminder asking for visit confirmation or cancellation reason
+        
+        Args:
+            appointment_data: Dictionary containing appointment information
+            
+        Returns:
+            RenderedEmail with subject and body
+        """
+        fields = {**_REMINDER_PLACEHOLDERS, **appointment_data}
+        
+        subject = _render(self._bound[_VISIT_CONFIRMATION_SUBJECT], fields)
+        body = _render(self._bound[_VISIT_CONFIRMATION_BODY], fields)
+        
+        return RenderedEmail(subject, body)
+    
+    def sms_templates(self, appointment_data: AppointmentTD, reminder_type: str) -> str:
+        """
+        SMS templates for different reminder types
+        
+        Args:
+            appointment_data: Dictionary containing appointment information
+            reminder_type: Type of reminder (regular, form_check, confirmation)
+            
+        Returns:
+            SMS message text
+        """
+        return self._sms_builders.get(reminder_type, self._sms_default)(appointment_data)
+    
+    def _render_sms(self, reminder_type: str, appointment_data: Dict) -> str:
+        """Render one of the clinic-bound SMS templates"""
+        fields = {**_REMINDER_PLACEHOLDERS, **appointment_data}
+        fields["id6"] = str(fields["appointment_id"])[-6:]
+        
+        return _render(self._sms_templates[reminder_type], fields)
+    
+    def _sms_regular(self, appointment_data: Dict) -> str:
+        return self._render_sms("regular", appointment_data)
+    
+    def _sms_form_check(self, appointment_data: Dict) -> str:
+        return self._render_sms("form_check", appointment_data)
+    
+    def _sms_confirmation(self, appointment_data: Dict) -> str:
+        return self._render_sms("confirmation", appointment_data)
+    
+    def _sms_default(self, appointment_data: Dict) -> str:
+        return "Appointment reminder from " + self.clinic_name
 
 
-# Example usage
-if __name__ == "__main__":
-    templates = IntakeFormEmailTemplates("Springfield Medical Center", "(555) 123-4567")
+class IntakeFormEmailTemplates:
+    """Email templates for sending intake forms to patients"""
     
-    # Example patient data
-    patient_data = {
-        "first_name": "John",
-        "last_name": "Doe",
-        "appointment_date": "January 15, 2024",
-        "appointment_time": "10:00 AM",
-        "doctor_name": "Dr. Sarah Johnson",
-        "clinic_address": "123 Medical Drive, Springfield, IL",
-        "intake_form_link": "https://clinic.com/intake/form/abc123",
-        "patient_portal_link": "https://clinic.com/portal"
-    }
+    def __init__(self, clinic_name: str = "Medical Clinic", clinic_phone: str = "(555) 123-4567"):
+        self.clinic_name = clinic_name
+        self.clinic_phone = clinic_phone
+        self._clinic_fields = {
+            "clinic_name": clinic_name,
+            "clinic_phone": clinic_phone
+        }
+        
+        # Templates with the clinic fields already filled in, keyed by the module template
+        self._bound = {
+            template: _bind_fields(template, self._clinic_fields)
+            for template in (
+                _CONFIRMATION_WITH_INTAKE_SUBJECT, _CONFIRMATION_WITH_INTAKE_BODY,
+                _INTAKE_REMINDER_BODY, _INTAKE_RECEIVED_BODY,
+                _INTAKE_INCOMPLETE_BODY, _INTAKE_FOLLOWUP_BODY
+            )
+        }
+    
+    def appointment_confirmation_with_intake_form(self, patient_data: Dict) -> RenderedEmail:
+        """
+        Email template for appointment confirmation with intake form
+        
+        Args:
+            patient_data: Dictionary containing patient and appointment information
+            
+        Returns:
+            RenderedEmail with subject and body
+        """
+        fields = {**_CONFIRMATION_WITH_INTAKE_PLACEHOLDERS, **patient_data}
+        
+        subject = _render(self._bound[_CONFIRMATION_WITH_INTAKE_SUBJECT], fields)
+        body = _render(self._bound[_CONFIRMATION_WITH_INTAKE_BODY], fields)
+        
+        return RenderedEmail(subject, body)
     
-    # Generate confirmation email
-    confirmation = templates.appointment_confirmation_with_intake_form(patient_data)
-    print("APPOINTMENT CONFIRMATION EMAIL:")
-    print(f"Subject: {confirmation['subject']}")
-    print(f"Body:\n{confirmation['body']}")
-    print("\n" + "="*80 + "\n")
+    def intake_form_reminder(self, patient_data: Dict) -> RenderedEmail:
+        """
+        Email template for intake form completion reminder
+        
+        Args:
+            patient_data: Dictionary containing patient information
+            
+        Returns:
+            RenderedEmail with subject and body
+        """
+        subject = _INTAKE_REMINDER_SUBJECT
+        body = _render(
+            self._bound[_INTAKE_REMINDER_BODY],
+            {**_INTAKE_PLACEHOLDERS, **patient_data}
+        )
+        
+        return RenderedEmail(subject, body)
+    
+    def intake_form_received_confirmation(self, patient_data: Dict) -> RenderedEmail:
+        """
+        Email template confirming intake form has been received
+        
+        Args:
+            patient_data: Dictionary containing patient information
+            
+        Returns:
+            RenderedEmail with subject and body
+        """
+        subject = _INTAKE_RECEIVED_SUBJECT
+        body = _render(
+            self._bound[_INTAKE_RECEIVED_BODY],
+            {**_INTAKE_PLACEHOLDERS, **patient_data}
+        )
+        
+        return RenderedEmail(subject, body)
+    
+    def intake_form_incomplete_notification(self, patient_data: Dict, missing_fields: list) -> RenderedEmail:
+        """
+        Email template for incomplete intake form notification
+        
+        Args:
+            patient_data: Dictionary containing patient information
+            missing_fields: List of missing required fields
+            
+        Returns:
+            RenderedEmail with subject and body
+        """
+        subject = _INTAKE_INCOMPLETE_SUBJECT
+        
+        # One join with the bullet in the separator instead of an f-string per field
+        missing_items = "• " + "\n• ".join(map(str, missing_fields)) if missing_fields else ""
+        
+        body = _render(
+            self._bound[_INTAKE_INCOMPLETE_BODY],
+            {**_INTAKE_PLACEHOLDERS, **patient_data, "missing_items": missing_items}
+        )
+        
+        return RenderedEmail(subject, body)
+    
+    def intake_form_followup_questions(self, patient_data: Dict, questions: list) -> RenderedEmail:
+        """
+        Email template for follow-up questions about intake form
+        
+        Args:
+            patient_data: Dictionary containing patient information
+            questions: List of follow-up questions from medical staff
+            
+        Returns:
+            RenderedEmail with subject and body
+        """
+        subject = _INTAKE_FOLLOWUP_SUBJECT
+        
+        # A list comprehension beats a generator or map() here: str.join materializes its input anyway
+        question_list = "\n".join([f"{i}. {q}" for i, q in enumerate(questions, 1)])
+        
+        body = _render(
+            self._bound[_INTAKE_FOLLOWUP_BODY],
+            {**_INTAKE_PLACEHOLDERS, **patient_data, "question_list": question_list}
+        )
+        
+        return RenderedEmail(subject, body)
+
+
+@functools.lru_cache(maxsize=8)
+def get_reminder_templates(clinic_name: str = "Medical Clinic",
+                           clinic_phone: str = "(555) 123-4567",
+                           emergency_phone: str = "(555) 999-8888") -> AppointmentReminderTemplates:
+    """
+    Shared AppointmentReminderTemplates instance for a clinic
+    
+    Instances are cached per (clinic_name, clinic_phone, emergency_phone); call
+    get_reminder_templates.cache_clear() after changing clinic details at runtime.
+    """
+    return AppointmentReminderTemplates(clinic_name, clinic_phone, emergency_phone)
+
+
+@functools.lru_cache(maxsize=8)
+def get_intake_templates(clinic_name: str = "Medical Clinic",
+                         clinic_phone: str = "(555) 123-4567") -> IntakeFormEmailTemplates:
+    """
+    Shared IntakeFormEmailTemplates instance for a clinic
     
-    # Generate reminder email
-    reminder = templates.intake_form_reminder(patient_data)
-    print("INTAKE FORM REMINDER EMAIL:")
-    print(f"Subject: {reminder['subject']}")
-    print(f"Body:\n{reminder['body']}")
+    Instances are cached per (clinic_name, clinic_phone); call
+    get_intake_templates.cache_clear() after changing clinic details at runtime.
+    """
+    return IntakeFormEmailTemplates(clinic_name, clinic_phone)
@@ -4,54 +4,28 @@ Creates printable intake forms and handles PDF generation
 """
 
 from datetime import datetime
+from pathlib import Path
 from typing import Dict, Optional
 import json
 
 
-class PDFIntakeFormGenerator:
-    """Generate PDF-style intake forms that can be printed or filled digitally"""
-    
-    def __init__(self):
-        self.form_template = self.load_form_template()
-    
-    def load_form_template(self) -> Dict:
-        """Load the intake form template"""
-        # This would normally load from the JSON file
-        # For now, we'll use a basic template structure
-        return {
-            "clinic_name": "Medical Clinic",
-            "form_title": "NEW PATIENT INTAKE FORM",
-            "instructions": "Please complete this form in its entirety and bring it to your appointment."
-        }
-    
-    def generate_printable_form(self, output_path: str = None) -> str:
-        """Generate a printable intake form in text format"""
-        if output_path is None:
-            output_path = f"forms/printable_intake_form_{datetime.now().strftime('%Y%m%d')}.txt"
-        
-        form_content = self._create_printable_content()
-        
-        with open(output_path, 'w') as f:
-            f.write(form_content)
-        
-        return output_path
-    
-    def _create_printable_content(self) -> str:
-        """Create the printable form content"""
-        content = f"""
-{'='*80}
+# The printable form and checklist are static, so they are built once at import
+_SEP = '=' * 80
+
+_PRINTABLE_FORM_TEMPLATE = f"""
+{_SEP}
                             MEDICAL CLINIC
                         NEW PATIENT INTAKE FORM
-{'='*80}
+{_SEP}
 
 Date: ____________    Patient ID: ____________    
 
 INSTRUCTIONS: Please complete this form in its entirety. All fields marked with 
 an asterisk (*) are required. Please print clearly.
 
-{'='*80}
+{_SEP}
                           PERSONAL INFORMATION
-{'='*80}
+{_SEP}
 
 First Name: *_________________________  Middle Name: _____________________
 
@@ -62,9 +36,9 @@ Date of Birth: *_____/_____/_____      Gender: *___________________
 
 Marital Status: ________________       Social Security #: *____-___-_____
 
-{'='*80}
+{_SEP}
                           CONTACT INFORMATION  
-{'='*80}
+{_SEP}
 
 Address: *____________________________________________________________
 
@@ -76,9 +50,9 @@ Email Address: *______________________________________________________
 
 Preferred Contact Method: *□ Phone  □ Email  □ Text Message
 
-{'='*80}
+{_SEP}
                           EMERGENCY CONTACT
-{'='*80}
+{_SEP}
 
 Emergency Contact Name: *__________________________________________
 
@@ -88,9 +62,9 @@ Emergency Phone Number: *(____)____-______
 
 Emergency Email: ________________________________________________
 
-{'='*80}
+{_SEP}
                          INSURANCE INFORMATION
-{'='*80}
+{_SEP}
 
 Insurance Carrier: *____________________________________________
 
@@ -102,9 +76,9 @@ Policy Holder Name: __________________________________________
 
 Relationship to Patient: □ Self  □ Spouse  □ Parent  □ Child  □ Other
 
-{'='*80}
+{_SEP}
                            MEDICAL HISTORY
-{'='*80}
+{_SEP}
 
 Primary Care Physician: ________________________________________
 
@@ -129,9 +103,9 @@ Family Medical History: _______________________________________
 ____________________________________________________________
 ____________________________________________________________
 
-{'='*80}
+{_SEP}
                          LIFESTYLE INFORMATION
-{'='*80}
+{_SEP}
 
 Smoking Status: *□ Never smoked  □ Former smoker  □ Current smoker
 
@@ -140,9 +114,9 @@ Alcohol Use: □ None  □ Occasional  □ Moderate  □ Heavy
 Exercise Habits: ______________________________________________
 ____________________________________________________________
 
-{'='*80}
+{_SEP}
                         CONSENT AND AUTHORIZATION
-{'='*80}
+{_SEP}
 
 □ *I consent to treatment by the medical staff
 
@@ -159,9 +133,9 @@ Print Name: *__________________________________________________
 Date: *_____/_____/_____
        MM   DD   YYYY
 
-{'='*80}
+{_SEP}
                             FOR OFFICE USE ONLY
-{'='*80}
+{_SEP}
 
 Form Received: _____/_____/_____    Staff Initials: ___________
 
@@ -172,18 +146,18 @@ Copay Collected: $ __________      Payment Method: ____________
 Notes: ________________________________________________________
 ____________________________________________________________
 
-{'='*80}
+{_SEP}
 
 Thank you for choosing our medical practice. We look forward to 
 providing you with excellent healthcare services.
 
 For questions about this form, please call: (555) 123-4567
-"""
-        return content.strip()
-    
-    def generate_form_checklist(self) -> str:
-        """Generate a checklist for intake form completion"""
-        checklist = """
+""".strip()
+
+# Encoded once for generate_printable_form's single binary write
+_PRINTABLE_FORM_BYTES = _PRINTABLE_FORM_TEMPLATE.encode('utf-8')
+
+_CHECKLIST_TEXT = """
 INTAKE FORM COMPLETION CHECKLIST
 
 Before your appointment, please ensure you have completed the following:
@@ -238,8 +212,43 @@ IMPORTANT REMINDERS:
 - Inform us of any changes to your insurance before your visit
 
 Questions? Call us at (555) 123-4567
-"""
-        return checklist.strip()
+""".strip()
+
+
+class PDFIntakeFormGenerator:
+    """Generate PDF-style intake forms that can be printed or filled digitally"""
+    
+    def __init__(self):
+        self.form_template = self.load_form_template()
+    
+    def load_form_template(self) -> Dict:
+        """Load the intake form template"""
+        # This would normally load from the JSON file
+        # For now, we'll use a basic template structure
+        return {
+            "clinic_name": "Medical Clinic",
+            "form_title": "NEW PATIENT INTAKE FORM",
+            "instructions": "Please complete this form in its entirety and bring it to your appointment."
+        }
+    
+    def generate_printable_form(self, output_path: str = None) -> str:
+        """Generate a printable intake form in text format"""
+        if output_path is None:
+            output_path = f"forms/printable_intake_form_{datetime.now().strftime('%Y%m%d')}.txt"
+        
+        path = Path(output_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(_PRINTABLE_FORM_BYTES)
+        
+        return output_path
+    
+    def _create_printable_content(self) -> str:
+        """Create the printable form content"""
+        return _PRINTABLE_FORM_TEMPLATE
+    
+    def generate_form_checklist(self) -> str:
+        """Generate a checklist for intake form completion"""
+        return _CHECKLIST_TEXT
 
 
 # Example usage
@@ -2,15 +2,187 @@
 Automated Reminder System Engine
 """
 
+import csv
+import itertools
 import pandas as pd
 import logging
-from datetime import datetime, timedelta
+import re
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import closing
+from datetime import date, datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
-import uuid
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Reminder ledger layout
+REMINDER_COLUMNS = [
+    'reminder_id', 'appointment_id', 'patient_id', 'reminder_type',
+    'scheduled_time', 'delivery_method', 'status', 'created_at',
+    'sent_at', 'patient_response', 'response_time', 'retry_count', 'notes',
+    'scheduled_time_ts'
+]
+
+# Column types for the ledger, so pandas doesn't infer them per read and the
+# initially-empty sent_at/patient_response/response_time columns stay textual
+REMINDER_DTYPES = {column: str for column in REMINDER_COLUMNS}
+REMINDER_DTYPES['retry_count'] = 'int64'
+REMINDER_DTYPES['scheduled_time_ts'] = 'int64'
+
+# Small fixed vocabularies, held as categoricals so equality filters compare integer codes.
+# Applied after the update log is overlaid, since updates may introduce new values.
+REMINDER_CATEGORY_DTYPES = {'status': 'category', 'reminder_type': 'category', 'delivery_method': 'category'}
+
+# Appointment date/time formats, grouped by the separators that identify them
+ISO_DATE_FORMATS = ('%Y-%m-%d',)
+SLASH_DATE_FORMATS = ('%m/%d/%Y', '%d/%m/%Y')
+MINUTES_TIME_FORMATS = ('%H:%M',)
+TWELVE_HOUR_TIME_FORMATS = ('%I:%M %p',)
+SECONDS_TIME_FORMATS = ('%H:%M:%S',)
+
+# Mutable ledger fields; each status change appends a snapshot of these to the update log
+REMINDER_UPDATE_COLUMNS = ['reminder_id', 'status', 'scheduled_time', 'sent_at', 'retry_count', 'scheduled_time_ts']
+
+# scheduled_time_ts for a ledger row whose scheduled_time cannot be parsed, so it is never due
+UNPARSEABLE_SCHEDULED_TS = 2**63 - 1
+
+# Update log rows that trigger folding the log back into the ledger
+REMINDER_COMPACT_THRESHOLD = 1000
+
+# Per-process sequence appended to reminder ids; next() on itertools.count is atomic under the GIL
+_REMINDER_COUNTER = itertools.count()
+
+# Patient response keywords, each found in one regex scan of the reply.
+# Substring matches, so "confirmed" and "cancelled" count as their keywords.
+FORM_CHECK_KEYWORDS = re.compile(r'completed|help|print')
+CONFIRMATION_KEYWORDS = re.compile(r'confirm|cancel|reschedule')
+CANCELLATION_REASON_KEYWORDS = re.compile(r'sick|emergency|schedule')
+
+# Response result per keyword, in priority order: the first keyword found wins
+FORM_CHECK_ACTIONS = {
+    'completed': {
+        "status": "success",
+        "action": "forms_completed",
+        "message": "Thank you! Your forms are marked as completed.",
+        "next_action": "none"
+    },
+    'help': {
+        "status": "success",
+        "action": "help_requested",
+        "message": "We'll call you to help with the forms.",
+        "next_action": "staff_callback"
+    },
+    'print': {
+        "status": "success",
+        "action": "print_requested",
+        "message": "Printable forms will be resent to your email.",
+        "next_action": "resend_forms"
+    },
+}
+
+# The cancel message is filled in with the reason found in the reply
+CONFIRMATION_ACTIONS = {
+    'confirm': {
+        "status": "success",
+        "action": "visit_confirmed",
+        "message": "Great! We'll see you at your appointment.",
+        "next_action": "none"
+    },
+    'cancel': {
+        "status": "success",
+        "action": "appointment_cancelled",
+        "message": "Appointment cancelled. Reason: {reason}",
+        "next_action": "process_cancellation"
+    },
+    'reschedule': {
+        "status": "success",
+        "action": "reschedule_requested",
+        "message": "We'll contact you to schedule a new appointment time.",
+        "next_action": "staff_reschedule"
+    },
+}
+
+# Cancellation reason per keyword, in priority order
+CANCELLATION_REASONS = {'sick': 'sick', 'emergency': 'emergency', 'schedule': 'schedule_conflict'}
+
+# Keyword pattern and action table for each reminder type that accepts replies
+RESPONSE_ACTIONS = {
+    'form_check': (FORM_CHECK_KEYWORDS, FORM_CHECK_ACTIONS),
+    'confirmation': (CONFIRMATION_KEYWORDS, CONFIRMATION_ACTIONS),
+}
+
+# Rows read per chunk when scanning the ledger, keeps memory bounded for large histories
+REMINDER_CHUNK_SIZE = 50_000
+
+# Serializes SQLite reminder cache rebuilds across engines in this process
+_SQLITE_REBUILD_LOCK = threading.Lock()
+
+
+def _load_indexed_csv(path: Path, id_column: str) -> pd.DataFrame:
+    """
+    Read a CSV indexed by its id column
+    
+    The id column is kept as a column too, and only the first row per id is kept,
+    matching the first-match lookups this replaces.
+    """
+    df = pd.read_csv(path).set_index(id_column, drop=False)
+    return df[~df.index.duplicated(keep='first')]
+
+
+# Delivery method by (reminder_type, has_email, has_phone):
+# - Form check: Email preferred (better for links/attachments)
+# - Confirmation: Both email and SMS for urgency
+# - Regular: Email first, SMS backup
+DELIVERY_METHODS = {
+    ('form_check', True, True): 'email',
+    ('form_check', True, False): 'email',
+    ('form_check', False, True): 'sms',
+    ('form_check', False, False): 'none',
+    ('confirmation', True, True): 'email+sms',
+    ('confirmation', True, False): 'email',
+    ('confirmation', False, True): 'sms',
+    ('confirmation', False, False): 'none',
+    ('regular', True, True): 'email',
+    ('regular', True, False): 'email',
+    ('regular', False, True): 'sms',
+    ('regular', False, False): 'none',
+}
+
+
+def _delivery_method_for(reminder_type: str, has_email: bool, has_phone: bool) -> str:
+    """Look up the delivery method; unknown reminder types follow the regular rules"""
+    method = DELIVERY_METHODS.get((reminder_type, has_email, has_phone))
+    if method is None:
+        method = DELIVERY_METHODS[('regular', has_email, has_phone)]
+    return method
+
+
+def _epoch_seconds(moment: datetime) -> int:
+    """Unix timestamp in whole seconds, as stored in scheduled_time_ts"""
+    return int(moment.timestamp())
+
+
+class Reminder(NamedTuple):
+    """One row of the reminder ledger, missing values are None"""
+    reminder_id: str
+    appointment_id: str
+    patient_id: str
+    reminder_type: str
+    scheduled_time: str
+    delivery_method: str
+    status: str
+    created_at: Optional[str]
+    sent_at: Optional[str]
+    patient_response: Optional[str]
+    response_time: Optional[str]
+    retry_count: int
+    notes: Optional[str]
+    scheduled_time_ts: int
+
 
 class AppointmentReminderEngine:
     """
@@ -30,9 +202,15 @@ class AppointmentReminderEngine:
         
         # Initialize reminder tracking
         self.reminder_file = self.data_dir / "reminders" / "reminder_schedule.csv"
+        self.reminder_updates_file = self.data_dir / "reminders" / "reminder_updates.csv"
+        self.reminder_db = self.data_dir / "reminders" / "reminder_cache.sqlite"
         self.appointments_file = self.data_dir / "appointments" / "scheduled_appointments.csv"
         self.patients_file = self.data_dir / "patients" / "patient_database.csv"
         
+        # Appointments/patients tables by path, as (mtime_ns, DataFrame); one copy each,
+        # replaced when the file changes
+        self._tables = {}
+        
         self._ensure_reminder_database()
     
     def _ensure_reminder_database(self):
@@ -42,16 +220,42 @@ class AppointmentReminderEngine:
                 self.reminder_file.parent.mkdir(parents=True, exist_ok=True)
                 
                 # Create empty reminder database with headers
-                reminder_df = pd.DataFrame(columns=[
-                    'reminder_id', 'appointment_id', 'patient_id', 'reminder_type',
-                    'scheduled_time', 'delivery_method', 'status', 'created_at',
-                    'sent_at', 'patient_response', 'response_time', 'retry_count', 'notes'
-                ])
+                reminder_df = pd.DataFrame(columns=REMINDER_COLUMNS)
                 reminder_df.to_csv(self.reminder_file, index=False)
                 logger.info("Created reminder database")
+            else:
+                self._migrate_scheduled_time_ts()
         except Exception as e:
             logger.error(f"Error ensuring reminder database: {e}")
     
+    def _migrate_scheduled_time_ts(self):
+        """Add the scheduled_time_ts column to a ledger written before it existed"""
+        with open(self.reminder_file, newline='', encoding='utf-8') as f:
+            header = next(csv.reader(f), [])
+        if 'scheduled_time_ts' in header:
+            return
+        
+        # Fold in the update log too, since its rows lack the column as well
+        ledger = pd.read_csv(self.reminder_file, dtype=REMINDER_DTYPES)
+        ledger = self._apply_updates(ledger, self._read_updates())
+        
+        # One malformed or missing time must not abort the migration of every other row
+        timestamps = []
+        for value in ledger['scheduled_time']:
+            try:
+                timestamps.append(_epoch_seconds(datetime.fromisoformat(value)))
+            except (TypeError, ValueError, OverflowError, OSError):
+                timestamps.append(UNPARSEABLE_SCHEDULED_TS)
+        ledger['scheduled_time_ts'] = timestamps
+        
+        unparseable = timestamps.count(UNPARSEABLE_SCHEDULED_TS)
+        if unparseable:
+            logger.warning(f"{unparseable} reminders have an unparseable scheduled_time and will not be sent")
+        
+        ledger[REMINDER_COLUMNS].to_csv(self.reminder_file, index=False)
+        self.reminder_updates_file.unlink(missing_ok=True)
+        logger.info("Added scheduled_time_ts to the reminder database")
+    
     def schedule_reminders_for_appointment(self, appointment_id: str) -> Dict[str, str]:
         """
         Schedule all three types of reminders for a new appointment
@@ -64,22 +268,20 @@ class AppointmentReminderEngine:
         """
         try:
             # Load appointment and patient data
-            appointments_df = pd.read_csv(self.appointments_file)
-            patients_df = pd.read_csv(self.patients_file)
+            appointments_df = self._load_table(self.appointments_file, 'appointment_id')
+            patients_df = self._load_table(self.patients_file, 'patient_id')
             
             # Find the appointment
-            appointment = appointments_df[appointments_df['appointment_id'] == appointment_id]
-            if appointment.empty:
+            if appointment_id not in appointments_df.index:
                 return {"status": "error", "message": f"Appointment {appointment_id} not found"}
             
-            appointment_data = appointment.iloc[0]
+            appointment_data = appointments_df.loc[appointment_id]
             
             # Get patient data
-            patient = patients_df[patients_df['patient_id'] == appointment_data['patient_id']]
-            if patient.empty:
+            if appointment_data['patient_id'] not in patients_df.index:
                 return {"status": "error", "message": f"Patient {appointment_data['patient_id']} not found"}
             
-            patient_data = patient.iloc[0]
+            patient_data = patients_df.loc[appointment_data['patient_id']]
             
             # Parse appointment datetime
             appointment_datetime = self._parse_appointment_datetime(
@@ -90,19 +292,27 @@ class AppointmentReminderEngine:
             if not appointment_datetime:
                 return {"status": "error", "message": "Could not parse appointment date/time"}
             
+            # Contact details decide the delivery method, so check them once for all reminder types
+            has_email, has_phone = self._contact_flags(patient_data)
+            
             # Schedule each reminder type
             scheduled_reminders = []
-            reminder_df = pd.read_csv(self.reminder_file) if self.reminder_file.exists() else pd.DataFrame()
+            new_reminders = []
+            
+            # All reminders for this appointment share one clock reading and creation time
+            now = datetime.now()
+            created_at = now.isoformat()
             
             for reminder_type, time_before in self.reminder_schedule.items():
                 reminder_time = appointment_datetime - time_before
                 
                 # Only schedule if reminder time is in the future
-                if reminder_time > datetime.now():
-                    reminder_id = f"REM_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+                if reminder_time > now:
+                    # Nanosecond clock plus a counter instead of a strftime and a uuid4 per id
+                    reminder_id = f"REM_{time.time_ns():x}_{next(_REMINDER_COUNTER):x}"
                     
                     # Determine delivery method based on patient preferences and type
-                    delivery_method = self._determine_delivery_method(patient_data, reminder_type)
+                    delivery_method = _delivery_method_for(reminder_type, has_email, has_phone)
                     
                     new_reminder = {
                         'reminder_id': reminder_id,
@@ -110,9 +320,10 @@ class AppointmentReminderEngine:
                         'patient_id': appointment_data['patient_id'],
                         'reminder_type': reminder_type,
                         'scheduled_time': reminder_time.isoformat(),
+                        'scheduled_time_ts': _epoch_seconds(reminder_time),
                         'delivery_method': delivery_method,
                         'status': 'scheduled',
-                        'created_at': datetime.now().isoformat(),
+                        'created_at': created_at,
                         'sent_at': '',
                         'patient_response': '',
                         'response_time': '',
@@ -120,9 +331,7 @@ class AppointmentReminderEngine:
                         'notes': f"Auto-scheduled for {appointment_datetime.strftime('%Y-%m-%d %H:%M')}"
                     }
                     
-                    # Add to DataFrame
-                    new_reminder_df = pd.DataFrame([new_reminder])
-                    reminder_df = pd.concat([reminder_df, new_reminder_df], ignore_index=True)
+                    new_reminders.append(new_reminder)
                     
                     scheduled_reminders.append({
                         'type': reminder_type,
@@ -130,8 +339,9 @@ class AppointmentReminderEngine:
                         'method': delivery_method
                     })
             
-            # Save updated reminders
-            reminder_df.to_csv(self.reminder_file, index=False)
+            # Append only the new reminders instead of rewriting the ledger
+            if new_reminders:
+                self._append_csv(self.reminder_file, new_reminders, REMINDER_COLUMNS)
             
             return {
                 "status": "success",
@@ -145,80 +355,70 @@ class AppointmentReminderEngine:
     
     def _parse_appointment_datetime(self, date_str: str, time_str: str) -> Optional[datetime]:
         """Parse appointment date and time strings into datetime object"""
-        try:
-            # Handle different date formats
-            date_formats = ['%Y-%m-%d', '%m/%d/%Y', '%d/%m/%Y']
-            time_formats = ['%H:%M', '%I:%M %p', '%H:%M:%S']
-            
-            parsed_date = None
-            for date_format in date_formats:
-                try:
-                    parsed_date = datetime.strptime(date_str, date_format).date()
-                    break
-                except ValueError:
-                    continue
-            
-            if not parsed_date:
-                logger.error(f"Could not parse date: {date_str}")
-                return None
-            
-            # Parse time
-            parsed_time = None
-            for time_format in time_formats:
-                try:
-                    parsed_time = datetime.strptime(time_str, time_format).time()
-                    break
-                except ValueError:
-                    continue
-            
-            if not parsed_time:
-                logger.error(f"Could not parse time: {time_str}")
-                return None
-            
-            return datetime.combine(parsed_date, parsed_time)
-            
-        except Exception as e:
-            logger.error(f"Error parsing appointment datetime: {e}")
+        # Blank CSV cells arrive as NaN floats; reject them here so the parsing below can't raise
+        if not isinstance(date_str, str) or not isinstance(time_str, str):
+            logger.error(f"Missing appointment date/time: {date_str!r} {time_str!r}")
+            return None
+        
+        # Fast path: ISO date with HH:MM or HH:MM:SS, parsed by the C-level fromisoformat
+        if len(date_str) == 10 and len(time_str) in (5, 8):
+            try:
+                parsed = datetime.fromisoformat(f"{date_str}T{time_str}")
+                if parsed.tzinfo is None:
+                    return parsed
+            except ValueError:
+                pass
+        
+        # Pick the candidate formats from the separators instead of trying every one
+        date_formats = SLASH_DATE_FORMATS if '/' in date_str else ISO_DATE_FORMATS
+        if time_str[-2:].upper() in ('AM', 'PM'):
+            time_formats = TWELVE_HOUR_TIME_FORMATS
+        elif time_str.count(':') == 2:
+            time_formats = SECONDS_TIME_FORMATS
+        else:
+            time_formats = MINUTES_TIME_FORMATS
+        
+        parsed_date = None
+        for date_format in date_formats:
+            try:
+                parsed_date = datetime.strptime(date_str, date_format).date()
+                break
+            except ValueError:
+                continue
+        
+        if not parsed_date:
+            logger.error(f"Could not parse date: {date_str}")
+            return None
+        
+        # Parse time
+        parsed_time = None
+        for time_format in time_formats:
+            try:
+                parsed_time = datetime.strptime(time_str, time_format).time()
+                break
+            except ValueError:
+                continue
+        
+        if not parsed_time:
+            logger.error(f"Could not parse time: {time_str}")
             return None
+        
+        return datetime.combine(parsed_date, parsed_time)
+    
+    @staticmethod
+    def _contact_flags(patient_data: pd.Series) -> Tuple[bool, bool]:
+        """Return (has_email, has_phone) for a patient row, treating NaN and blanks as missing"""
+        def present(value) -> bool:
+            if pd.isna(value) or not value:
+                return False
+            return bool(str(value).strip())
+        
+        return present(patient_data.get('email', '')), present(patient_data.get('phone', ''))
     
     def _determine_delivery_method(self, patient_data: pd.Series, reminder_type: str) -> str:
         """Determine the best delivery method for a reminder"""
-        # Safely get email and phone, handling NaN values
-        email = patient_data.get('email', '')
-        phone = patient_data.get('phone', '')
-        
-        # Handle NaN values from pandas
-        if pd.isna(email):
-            email = ''
-        if pd.isna(phone):
-            phone = ''
-            
-        has_email = bool(str(email).strip()) if email else False
-        has_phone = bool(str(phone).strip()) if phone else False
-        
-        # Priority logic:
-        # - Form check: Email preferred (better for links/attachments)
-        # - Confirmation: Both email and SMS for urgency
-        # - Regular: Email first, SMS backup
-        
-        if reminder_type == "form_check":
-            return "email" if has_email else "sms" if has_phone else "none"
-        elif reminder_type == "confirmation":
-            if has_email and has_phone:
-                return "email+sms"
-            elif has_email:
-                return "email"
-            elif has_phone:
-                return "sms"
-            else:
-                return "none"
-        else:  # regular reminder
-            if has_email:
-                return "email"
-            elif has_phone:
-                return "sms"
-            else:
-                return "none"
+        has_email, has_phone = self._contact_flags(patient_data)
+        return _delivery_method_for(reminder_type, has_email, has_phone)
     
     def check_and_send_due_reminders(self) -> Dict[str, List]:
         """
@@ -231,43 +431,65 @@ class AppointmentReminderEngine:
             if not self.reminder_file.exists():
                 return {"sent": [], "failed": [], "skipped": []}
             
-            reminder_df = pd.read_csv(self.reminder_file)
-            
-            # Filter for scheduled reminders that are due
             now = datetime.now()
-            due_reminders = reminder_df[
-                (reminder_df['status'] == 'scheduled') &
-                (pd.to_datetime(reminder_df['scheduled_time']) <= now)
-            ]
+            now_ts = _epoch_seconds(now)
             
             sent_reminders = []
             failed_reminders = []
             skipped_reminders = []
             
-            for idx, reminder in due_reminders.iterrows():
-                result = self._send_single_reminder(reminder)
+            # Status changes, recorded as snapshots of the mutable fields
+            updates = []
+            
+            # Stream the ledger chunk by chunk so only due rows are held, however long the history
+            for chunk in self._iter_reminder_chunks():
+                # Filter for scheduled reminders that are due, comparing the precomputed epoch seconds
+                due_reminders = chunk[(chunk['status'] == 'scheduled') & (chunk['scheduled_time_ts'] <= now_ts)]
+                if due_reminders.empty:
+                    continue
+                
+                # Look up appointment and patient data for the whole batch before sending
+                hydrated = self._hydrate_due_reminders(due_reminders)
                 
-                if result['status'] == 'sent':
-                    sent_reminders.append(result)
-                    # Update reminder status
-                    reminder_df.loc[idx, 'status'] = 'sent'
-                    reminder_df.loc[idx, 'sent_at'] = now.isoformat()
-                elif result['status'] == 'failed':
-                    failed_reminders.append(result)
-                    # Update retry count and status
-                    reminder_df.loc[idx, 'retry_count'] = reminder_df.loc[idx, 'retry_count'] + 1
-                    if reminder_df.loc[idx, 'retry_count'] >= 3:
-                        reminder_df.loc[idx, 'status'] = 'failed'
+                # Plain tuples from itertuples avoid boxing every row as a Series
+                reminders = map(Reminder._make, due_reminders[REMINDER_COLUMNS].itertuples(index=False, name=None))
+                for reminder, (combined_data, skip_reason) in zip(reminders, hydrated):
+                    if skip_reason:
+                        result = {"status": "skipped", "reason": skip_reason}
+                    else:
+                        # A failed delivery is recorded against its reminder without stopping the batch
+                        try:
+                            result = self._send_single_reminder(reminder, combined_data)
+                        except Exception as e:
+                            logger.error(f"Error sending reminder {reminder.reminder_id}: {e}")
+                            result = {"status": "failed", "reminder_id": reminder.reminder_id, "reason": str(e)}
+                    
+                    update = {column: getattr(reminder, column) for column in REMINDER_UPDATE_COLUMNS}
+                    if result['status'] == 'sent':
+                        sent_reminders.append(result)
+                        # Update reminder status
+                        update['status'] = 'sent'
+                        update['sent_at'] = now.isoformat()
+                    elif result['status'] == 'failed':
+                        failed_reminders.append(result)
+                        # Update retry count and status
+                        update['retry_count'] += 1
+                        if update['retry_count'] >= 3:
+                            update['status'] = 'failed'
+                        else:
+                            # Reschedule for retry in 30 minutes
+                            retry_time = now + timedelta(minutes=30)
+                            update['scheduled_time'] = retry_time.isoformat()
+                            update['scheduled_time_ts'] = _epoch_seconds(retry_time)
                     else:
-                        # Reschedule for retry in 30 minutes
-                        retry_time = now + timedelta(minutes=30)
-                        reminder_df.loc[idx, 'scheduled_time'] = retry_time.isoformat()
-                else:
-                    skipped_reminders.append(result)
-                    reminder_df.loc[idx, 'status'] = 'skipped'
+                        skipped_reminders.append(result)
+                        update['status'] = 'skipped'
+                    updates.append(update)
             
-            # Save updated reminders
-            reminder_df.to_csv(self.reminder_file, index=False)
+            # Save the changes to the update log, folding it into the ledger once it grows large
+            if updates:
+                self._append_csv(self.reminder_updates_file, updates, REMINDER_UPDATE_COLUMNS)
+                self._compact_reminders()
             
             return {
                 "sent": sent_reminders,
@@ -279,114 +501,266 @@ class AppointmentReminderEngine:
             logger.error(f"Error checking due reminders: {e}")
             return {"sent": [], "failed": [], "skipped": []}
     
-    def _send_single_reminder(self, reminder: pd.Series) -> Dict:
-        """Send a single reminder"""
-        try:
-            # Get appointment and patient data
-            appointments_df = pd.read_csv(self.appointments_file)
-            patients_df = pd.read_csv(self.patients_file)
-            
-            appointment = appointments_df[appointments_df['appointment_id'] == reminder['appointment_id']]
-            if appointment.empty:
-                return {"status": "skipped", "reason": "Appointment not found"}
-            
-            patient = patients_df[patients_df['patient_id'] == reminder['patient_id']]
-            if patient.empty:
-                return {"status": "skipped", "reason": "Patient not found"}
-            
-            # Prepare combined data for templates
-            appointment_data = appointment.iloc[0].to_dict()
-            patient_data = patient.iloc[0].to_dict()
-            
-            # Clean data to handle NaN values
-            def clean_value(value):
-                if pd.isna(value):
-                    return ''
-                return str(value).strip()
-            
-            # Build patient name safely
-            patient_name = clean_value(patient_data.get('full_name', ''))
-            if not patient_name:
-                first_name = clean_value(patient_data.get('first_name', ''))
-                last_name = clean_value(patient_data.get('last_name', ''))
-                patient_name = f"{first_name} {last_name}".strip()
-            
-            combined_data = {
+    def _hydrate_due_reminders(self, due_reminders: pd.DataFrame) -> List[Tuple[Optional[Dict], Optional[str]]]:
+        """
+        Join due reminders with their appointment and patient rows in one pass
+        
+        Args:
+            due_reminders: Ledger rows about to be sent
+            
+        Returns:
+            One (combined_data, skip_reason) pair per due reminder, in order; exactly
+            one of the two is None
+        """
+        appointments_df = self._load_table(self.appointments_file, 'appointment_id')
+        patients_df = self._load_table(self.patients_file, 'patient_id')
+        
+        has_appointment = due_reminders['appointment_id'].isin(appointments_df.index)
+        has_patient = due_reminders['patient_id'].isin(patients_df.index)
+        found = due_reminders[has_appointment & has_patient]
+        
+        # Only matched rows are selected, so the selection keeps the source column dtypes
+        appointments = appointments_df.loc[found['appointment_id']]
+        patients = patients_df.loc[found['patient_id']]
+        
+        # Clean text columns once for the whole batch: NaN -> '', then strip
+        def clean_column(frame: pd.DataFrame, column: str, default: str = '') -> pd.Series:
+            if column not in frame:
+                return pd.Series(default, index=frame.index)
+            return frame[column].fillna('').astype(str).str.strip()
+        
+        # Build patient names safely, falling back to first + last name
+        full_names = clean_column(patients, 'full_name')
+        split_names = (clean_column(patients, 'first_name') + ' ' + clean_column(patients, 'last_name')).str.strip()
+        patient_names = full_names.where(full_names != '', split_names)
+        
+        combined = iter([
+            {
                 **appointment_data,
                 'patient_name': patient_name,
-                'patient_email': clean_value(patient_data.get('email', '')),
-                'patient_phone': clean_value(patient_data.get('phone', '')),
-                'doctor_name': clean_value(appointment_data.get('doctor_name', 'TBD'))
+                'patient_email': email,
+                'patient_phone': phone,
+                'doctor_name': doctor_name
             }
-            
-            # Send based on delivery method
-            delivery_method = reminder['delivery_method']
-            success = False
-            
-            if 'email' in delivery_method and self.email_service:
-                email_success = self.email_service.send_appointment_reminder(
-                    combined_data, 
-                    reminder['reminder_type']
-                )
-                success = email_success or success
-            
-            if 'sms' in delivery_method:
-                sms_success = self.email_service.send_sms_reminder(
-                    combined_data,
-                    reminder['reminder_type']
-                ) if self.email_service else True  # Simulated success
-                success = sms_success or success
-            
-            if success:
-                return {
-                    "status": "sent",
-                    "reminder_id": reminder['reminder_id'],
-                    "type": reminder['reminder_type'],
-                    "method": delivery_method,
-                    "patient": combined_data['patient_name']
-                }
+            for appointment_data, patient_name, email, phone, doctor_name in zip(
+                appointments.to_dict('records'),
+                patient_names.tolist(),
+                clean_column(patients, 'email').tolist(),
+                clean_column(patients, 'phone').tolist(),
+                clean_column(appointments, 'doctor_name', 'TBD').tolist()
+            )
+        ])
+        
+        hydrated = []
+        for appointment_found, patient_found in zip(has_appointment.tolist(), has_patient.tolist()):
+            if not appointment_found:
+                hydrated.append((None, "Appointment not found"))
+            elif not patient_found:
+                hydrated.append((None, "Patient not found"))
             else:
-                return {
-                    "status": "failed",
-                    "reminder_id": reminder['reminder_id'],
-                    "type": reminder['reminder_type'],
-                    "reason": "Delivery failed"
-                }
-                
-        except Exception as e:
-            logger.error(f"Error sending reminder {reminder.get('reminder_id', 'unknown')}: {e}")
+                hydrated.append((next(combined), None))
+        return hydrated
+    
+    def _send_single_reminder(self, reminder: Reminder, combined_data: Dict) -> Dict:
+        """Send a single reminder using its hydrated appointment/patient data; delivery errors propagate"""
+        # Send based on delivery method
+        delivery_method = reminder.delivery_method
+        success = False
+        
+        if 'email' in delivery_method and self.email_service:
+            email_success = self.email_service.send_appointment_reminder(
+                combined_data, 
+                reminder.reminder_type
+            )
+            success = email_success or success
+        
+        if 'sms' in delivery_method:
+            sms_success = self.email_service.send_sms_reminder(
+                combined_data,
+                reminder.reminder_type
+            ) if self.email_service else True  # Simulated success
+            success = sms_success or success
+        
+        if success:
+            return {
+                "status": "sent",
+                "reminder_id": reminder.reminder_id,
+                "type": reminder.reminder_type,
+                "method": delivery_method,
+                "patient": combined_data['patient_name']
+            }
+        else:
             return {
                 "status": "failed",
-                "reminder_id": reminder.get('reminder_id', 'unknown'),
-                "reason": str(e)
+                "reminder_id": reminder.reminder_id,
+                "type": reminder.reminder_type,
+                "reason": "Delivery failed"
             }
     
-    def get_reminder_status(self, appointment_id: str = None, patient_id: str = None) -> Dict:
-        """Get reminder status for appointment or patient"""
+    def _load_table(self, path: Path, id_column: str) -> pd.DataFrame:
+        """
+        Load an appointments/patients CSV indexed by id, reusing it while the file is unchanged
+        
+        The returned frame is shared between calls and must not be modified.
+        """
+        mtime_ns = path.stat().st_mtime_ns
+        cached = self._tables.get(path)
+        if cached is None or cached[0] != mtime_ns:
+            cached = self._tables[path] = (mtime_ns, _load_indexed_csv(path, id_column))
+        return cached[1]
+    
+    @staticmethod
+    def _append_csv(path: Path, rows: List[Dict], columns: List[str]) -> None:
+        """Append rows to a CSV file with csv.DictWriter, writing the header first if the file is new"""
+        is_new = not path.exists()
+        with open(path, 'a', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=columns, lineterminator='\n')
+            if is_new:
+                writer.writeheader()
+            # Missing values are written as empty fields, as DataFrame.to_csv does
+            writer.writerows(
+                {column: ('' if pd.isna(value) else value) for column, value in row.items()}
+                for row in rows
+            )
+    
+    def _read_updates(self) -> Optional[pd.DataFrame]:
+        """Read the latest update log entry per reminder, indexed by reminder_id"""
+        if not self.reminder_updates_file.exists():
+            return None
+        updates = pd.read_csv(self.reminder_updates_file, dtype=REMINDER_DTYPES)
+        return updates.drop_duplicates('reminder_id', keep='last').set_index('reminder_id')
+    
+    @staticmethod
+    def _apply_updates(ledger: pd.DataFrame, updates: Optional[pd.DataFrame]) -> pd.DataFrame:
+        """Overlay update log snapshots onto ledger rows to get their current state"""
+        if updates is None or updates.empty:
+            return ledger
+        changed = ledger['reminder_id'].isin(updates.index)
+        if changed.any():
+            changed_ids = ledger.loc[changed, 'reminder_id']
+            for column in updates.columns:
+                ledger.loc[changed, column] = changed_ids.map(updates[column]).to_numpy()
+        return ledger
+    
+    def _read_reminders(self) -> pd.DataFrame:
+        """Read the current reminder state: the ledger with the update log applied"""
+        ledger = pd.read_csv(self.reminder_file, dtype=REMINDER_DTYPES)
+        return self._apply_updates(ledger, self._read_updates()).astype(REMINDER_CATEGORY_DTYPES)
+    
+    def _iter_reminder_chunks(self, chunksize: int = REMINDER_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+        """Stream the current reminder state in fixed-size chunks instead of loading it whole"""
+        updates = self._read_updates()
+        for chunk in pd.read_csv(self.reminder_file, dtype=REMINDER_DTYPES, chunksize=chunksize):
+            yield self._apply_updates(chunk, updates).astype(REMINDER_CATEGORY_DTYPES)
+    
+    def _ensure_sqlite(self) -> sqlite3.Connection:
+        """
+        Open the SQLite reminder cache, rebuilding it when the ledger or update log is newer
+        
+        Returns:
+            Connection with a reminders table indexed for due, appointment and patient lookups
+        """
+        sources = (self.reminder_file, self.reminder_updates_file)
+        
+        def is_stale() -> bool:
+            # Rebuild when either file changed at or after the last rebuild; >= because mtimes are coarse
+            db_mtime = self.reminder_db.stat().st_mtime_ns if self.reminder_db.exists() else 0
+            return db_mtime == 0 or any(
+                path.exists() and path.stat().st_mtime_ns >= db_mtime for path in sources
+            )
+        
+        if is_stale():
+            with _SQLITE_REBUILD_LOCK:
+                # Another engine may have rebuilt the cache while this one waited
+                if is_stale():
+                    # Build into a temporary file and swap it in, so readers never see a half-built
+                    # table and a failed rebuild leaves no newer-looking partial cache behind
+                    fd, tmp_name = tempfile.mkstemp(suffix=".sqlite.tmp", dir=self.reminder_db.parent)
+                    os.close(fd)
+                    try:
+                        with closing(sqlite3.connect(tmp_name)) as tmp_conn:
+                            # Rebuild from the current state chunk by chunk to keep memory bounded
+                            for chunk in self._iter_reminder_chunks():
+                                chunk.to_sql("reminders", tmp_conn, if_exists="append", index=False)
+                            if not tmp_conn.execute("SELECT name FROM sqlite_master WHERE name = 'reminders'").fetchone():
+                                pd.DataFrame(columns=REMINDER_COLUMNS).to_sql("reminders", tmp_conn, index=False)
+                            tmp_conn.execute("CREATE INDEX IF NOT EXISTS idx_reminders_due ON reminders(status, scheduled_time)")
+                            tmp_conn.execute("CREATE INDEX IF NOT EXISTS idx_reminders_appointment_id ON reminders(appointment_id)")
+                            tmp_conn.execute("CREATE INDEX IF NOT EXISTS idx_reminders_patient_id ON reminders(patient_id)")
+                            tmp_conn.commit()
+                        os.replace(tmp_name, self.reminder_db)
+                    except Exception:
+                        Path(tmp_name).unlink(missing_ok=True)
+                        raise
+                    logger.info("Rebuilt SQLite reminder cache")
+        
+        return sqlite3.connect(self.reminder_db)
+    
+    def _compact_reminders(self) -> None:
+        """Rewrite the ledger with the update log applied once the log passes the threshold"""
+        with open(self.reminder_updates_file, 'rb') as f:
+            update_rows = sum(1 for _ in f) - 1
+        if update_rows < REMINDER_COMPACT_THRESHOLD:
+            return
+        
+        # Snapshots are idempotent, so a crash between these two steps loses nothing
+        self._read_reminders().to_csv(self.reminder_file, index=False)
+        self.reminder_updates_file.unlink()
+        logger.info(f"Compacted {update_rows} reminder updates into the ledger")
+    
+    def get_reminder_status(self, appointment_id: str = None, patient_id: str = None,
+                            on_date: Optional[date] = None, limit: Optional[int] = None) -> Dict:
+        """
+        Get reminder status for appointment or patient
+        
+        Args:
+            appointment_id: Only include reminders for this appointment
+            patient_id: Only include reminders for this patient
+            on_date: Only include reminders scheduled on this calendar day
+            limit: Return at most this many reminders (summary still counts all matches)
+            
+        Returns:
+            Dictionary with matching Reminder tuples and a status summary
+        """
         try:
             if not self.reminder_file.exists():
                 return {"reminders": [], "summary": {"total": 0}}
             
-            reminder_df = pd.read_csv(self.reminder_file)
-            
-            # Filter based on parameters
+            # Filter through the indexed SQLite cache so only matching rows are read
+            conditions = []
+            params = []
             if appointment_id:
-                filtered_reminders = reminder_df[reminder_df['appointment_id'] == appointment_id]
+                conditions.append("appointment_id = ?")
+                params.append(appointment_id)
             elif patient_id:
-                filtered_reminders = reminder_df[reminder_df['patient_id'] == patient_id]
-            else:
-                filtered_reminders = reminder_df
-            
-            reminders = filtered_reminders.to_dict('records')
-            
-            # Create summary
-            summary = {
-                "total": len(reminders),
-                "scheduled": len(filtered_reminders[filtered_reminders['status'] == 'scheduled']),
-                "sent": len(filtered_reminders[filtered_reminders['status'] == 'sent']),
-                "failed": len(filtered_reminders[filtered_reminders['status'] == 'failed']),
-                "skipped": len(filtered_reminders[filtered_reminders['status'] == 'skipped'])
-            }
+                conditions.append("patient_id = ?")
+                params.append(patient_id)
+            
+            if on_date is not None:
+                # scheduled_time is ISO 8601, so its first 10 characters are the calendar day
+                conditions.append("substr(scheduled_time, 1, 10) = ?")
+                params.append(on_date.isoformat())
+            
+            query = f"SELECT {', '.join(REMINDER_COLUMNS)} FROM reminders"
+            if conditions:
+                query += " WHERE " + " AND ".join(conditions)
+            query += " ORDER BY rowid"
+            
+            with closing(self._ensure_sqlite()) as conn:
+                filtered_reminders = pd.read_sql_query(query, conn, params=params)
+            
+            ledger_rows = filtered_reminders[REMINDER_COLUMNS]
+            if limit is not None:
+                ledger_rows = ledger_rows.head(limit)
+            ledger_rows = ledger_rows.astype(object)
+            ledger_rows = ledger_rows.where(ledger_rows.notna(), None)
+            reminders = [Reminder._make(row) for row in ledger_rows.itertuples(index=False, name=None)]
+            
+            # Create summary from one count of every status
+            status_counts = filtered_reminders['status'].value_counts()
+            summary = {"total": len(filtered_reminders)}
+            for status in ('scheduled', 'sent', 'failed', 'skipped'):
+                summary[status] = int(status_counts.get(status, 0))
             
             return {"reminders": reminders, "summary": summary}
             
@@ -410,61 +784,23 @@ class AppointmentReminderEngine:
             response_lower = response.lower().strip()
             current_time = datetime.now().isoformat()
             
-            # Process different response types
-            if reminder_type == "form_check":
-                if "completed" in response_lower:
-                    return {
-                        "status": "success",
-                        "action": "forms_completed",
-                        "message": "Thank you! Your forms are marked as completed.",
-                        "next_action": "none"
-                    }
-                elif "help" in response_lower:
-                    return {
-                        "status": "success",
-                        "action": "help_requested",
-                        "message": "We'll call you to help with the forms.",
-                        "next_action": "staff_callback"
-                    }
-                elif "print" in response_lower:
-                    return {
-                        "status": "success",
-                        "action": "print_requested",
-                        "message": "Printable forms will be resent to your email.",
-                        "next_action": "resend_forms"
-                    }
-                    
-            elif reminder_type == "confirmation":
-                if "confirm" in response_lower:
-                    return {
-                        "status": "success",
-                        "action": "visit_confirmed",
-                        "message": "Great! We'll see you at your appointment.",
-                        "next_action": "none"
-                    }
-                elif "cancel" in response_lower:
-                    cancellation_reason = "unspecified"
-                    if "sick" in response_lower:
-                        cancellation_reason = "sick"
-                    elif "emergency" in response_lower:
-                        cancellation_reason = "emergency"
-                    elif "schedule" in response_lower:
-                        cancellation_reason = "schedule_conflict"
-                    
-                    return {
-                        "status": "success",
-                        "action": "appointment_cancelled",
-                        "message": f"Appointment cancelled. Reason: {cancellation_reason}",
-                        "next_action": "process_cancellation",
-                        "cancellation_reason": cancellation_reason
-                    }
-                elif "reschedule" in response_lower:
-                    return {
-                        "status": "success",
-                        "action": "reschedule_requested",
-                        "message": "We'll contact you to schedule a new appointment time.",
-                        "next_action": "staff_reschedule"
-                    }
+            # Dispatch on the first keyword of this reminder type's table found in the reply
+            if reminder_type in RESPONSE_ACTIONS:
+                pattern, actions = RESPONSE_ACTIONS[reminder_type]
+                keywords = set(pattern.findall(response_lower))
+                for keyword, action in actions.items():
+                    if keyword in keywords:
+                        result = dict(action)
+                        if result['action'] == 'appointment_cancelled':
+                            reasons = set(CANCELLATION_REASON_KEYWORDS.findall(response_lower))
+                            cancellation_reason = next(
+                                (reason for reason_keyword, reason in CANCELLATION_REASONS.items()
+                                 if reason_keyword in reasons),
+                                "unspecified"
+                            )
+                            result['message'] = result['message'].format(reason=cancellation_reason)
+                            result['cancellation_reason'] = cancellation_reason
+                        return result
             
             # Default response for unrecognized input
             return {
@@ -2,12 +2,24 @@
 SMS Service Integration for Medical Appointment Reminders
 """
 
+import functools
+import importlib.util
 import logging
+import re
 from typing import Dict, Optional
 import os
 
 logger = logging.getLogger(__name__)
 
+# Everything that isn't a digit, stripped from phone numbers in one C-level pass
+_NON_DIGIT = re.compile(r'\D')
+
+# Keep-alive connections held for the Twilio API; sends go one at a time, so one is reused
+TWILIO_POOL_MAXSIZE = 1
+
+# US number as bare digits: optional country code 1, then the 10-digit national number
+_US_PHONE_DIGITS = re.compile(r'1?(\d{10})')
+
 
 class SMSService:
     """
@@ -33,15 +45,19 @@ class SMSService:
     def _init_simulated(self):
         """Initialize simulated SMS service"""
         self.is_real_service = False
-        logger.info("SMS Service initialized in SIMULATION mode")
-        logger.info("To enable real SMS:")
-        logger.info("1. Install provider: pip install twilio")
-        logger.info("2. Set environment variables: TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, TWILIO_PHONE_NUMBER")
-        logger.info("3. Change provider to 'twilio' in configuration")
+        logger.info(
+            "SMS Service initialized in SIMULATION mode\n"
+            "To enable real SMS:\n"
+            "1. Install provider: pip install twilio\n"
+            "2. Set environment variables: TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, TWILIO_PHONE_NUMBER\n"
+            "3. Change provider to 'twilio' in configuration"
+        )
     
     def _init_twilio(self):
         """Initialize Twilio SMS service"""
         try:
+            from requests.adapters import HTTPAdapter
+            from twilio.http.http_client import TwilioHttpClient
             from twilio.rest import Client
             
             account_sid = os.getenv('TWILIO_ACCOUNT_SID')
@@ -54,7 +70,10 @@ class SMSService:
                 self._init_simulated()
                 return
             
-            self.client = Client(account_sid, auth_token)
+            # One long-lived session so every message reuses a pooled TLS connection
+            http_client = TwilioHttpClient(pool_connections=True)
+            http_client.session.mount('https://', HTTPAdapter(pool_connections=10, pool_maxsize=TWILIO_POOL_MAXSIZE))
+            self.client = Client(account_sid, auth_token, http_client=http_client)
             self.is_real_service = True
             logger.info("Twilio SMS Service initialized successfully")
             
@@ -167,11 +186,11 @@ class SMSService:
     
     def _send_simulated_sms(self, to_phone: str, message: str, appointment_id: str = None) -> Dict:
         """Simulate SMS sending"""
-        logger.info(f"📱 SIMULATED SMS to {to_phone}")
-        logger.info(f"📄 Message content:")
-        logger.info(f"{message}")
-        logger.info(f"📋 Appointment ID: {appointment_id}")
-        logger.info("=" * 50)
+        # One record per message, formatted lazily only if INFO is enabled
+        logger.info(
+            "📱 SIMULATED SMS to %s\n📄 Message content:\n%s\n📋 Appointment ID: %s\n%s",
+            to_phone, message, appointment_id, "=" * 50
+        )
         
         return {
             "success": True,
@@ -186,16 +205,17 @@ class SMSService:
         if not phone:
             return ""
         
-        # Remove all non-digit characters
-        digits_only = ''.join(filter(str.isdigit, phone))
+        # Already-normalized input: +1xxxxxxxxxx (or any +11 digits, returned unchanged) and 1xxxxxxxxxx
+        if phone.isascii():
+            if len(phone) == 12 and phone[0] == '+' and phone[1:].isdigit():
+                return phone
+            if len(phone) == 11 and phone[0] == '1' and phone.isdigit():
+                return '+' + phone
         
-        # Add country code if missing (assume US)
-        if len(digits_only) == 10:
-            digits_only = "1" + digits_only
-        
-        # Format as +1xxxxxxxxxx
-        if len(digits_only) == 11 and digits_only.startswith('1'):
-            return f"+{digits_only}"
+        # Remove all non-digit characters, then format as +1xxxxxxxxxx (country code assumed US if missing)
+        match = _US_PHONE_DIGITS.fullmatch(_NON_DIGIT.sub('', phone))
+        if match:
+            return f"+1{match.group(1)}"
         
         return phone  # Return original if can't format
     
@@ -221,40 +241,8 @@ class SMSService:
         return {"status": "unknown", "message": "Status check not supported for this provider"}
 
 
-# Configuration class for easy SMS setup
-class SMSConfig:
-    """Configuration helper for SMS service"""
-    
-    @staticmethod
-    def get_recommended_provider() -> str:
-        """Get recommended SMS provider based on available credentials"""
-        # Check for Twilio credentials
-        if all([
-            os.getenv('TWILIO_ACCOUNT_SID'),
-            os.getenv('TWILIO_AUTH_TOKEN'),
-            os.getenv('TWILIO_PHONE_NUMBER')
-        ]):
-            return "twilio"
-        
-        # Check for AWS credentials
-        try:
-            import boto3
-            # Try to create SNS client to test credentials
-            boto3.client('sns')
-            return "aws_sns"
-        except:
-            pass
-        
-        return "simulated"
-    
-    @staticmethod
-    def setup_instructions(provider: str = None) -> str:
-        """Get setup instructions for SMS provider"""
-        if not provider:
-            provider = SMSConfig.get_recommended_provider()
-        
-        if provider == "twilio":
-            return """
+# Setup instructions per SMS provider, shown by SMSConfig.setup_instructions
+_TWILIO_INSTRUCTIONS = """
 🔧 TWILIO SMS SETUP INSTRUCTIONS:
 
 1. Sign up at https://www.twilio.com/
@@ -268,9 +256,8 @@ class SMSConfig:
 
 💰 Pricing: ~$0.0075 per SMS in the US
 """
-        
-        elif provider == "aws_sns":
-            return """
+
+_AWS_INSTRUCTIONS = """
 🔧 AWS SNS SMS SETUP INSTRUCTIONS:
 
 1. Set up AWS account and configure AWS CLI
@@ -283,9 +270,8 @@ class SMSConfig:
 
 💰 Pricing: ~$0.00645 per SMS in the US
 """
-        
-        else:
-            return """
+
+_SIMULATED_INSTRUCTIONS = """
 🔧 CURRENT: SIMULATED SMS MODE
 
 ✅ Advantages:
@@ -301,3 +287,57 @@ class SMSConfig:
 - Twilio (recommended for small-medium practices)
 - AWS SNS (good for larger enterprises)
 """
+
+_SETUP_INSTRUCTIONS = {
+    'twilio': _TWILIO_INSTRUCTIONS,
+    'aws_sns': _AWS_INSTRUCTIONS,
+    'simulated': _SIMULATED_INSTRUCTIONS,
+}
+
+
+# Configuration class for easy SMS setup
+class SMSConfig:
+    """Configuration helper for SMS service"""
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=1)
+    def get_recommended_provider() -> str:
+        """
+        Get recommended SMS provider based on available credentials
+        
+        Detected once per process; credentials changed later are not picked up.
+        """
+        # Check for Twilio credentials
+        if all([
+            os.getenv('TWILIO_ACCOUNT_SID'),
+            os.getenv('TWILIO_AUTH_TOKEN'),
+            os.getenv('TWILIO_PHONE_NUMBER')
+        ]):
+            return "twilio"
+        
+        # Check for AWS credentials, without paying for the boto3 import when it isn't installed
+        if importlib.util.find_spec('boto3') is None:
+            return "simulated"
+        
+        # Cheap signs of configured credentials first: env vars, a named profile, or the shared file
+        if (os.getenv('AWS_ACCESS_KEY_ID') or os.getenv('AWS_PROFILE')
+                or os.path.exists(os.path.expanduser('~/.aws/credentials'))):
+            return "aws_sns"
+        
+        # Otherwise resolve the credential chain once, without building an SNS client
+        try:
+            import boto3
+            if boto3.session.Session().get_credentials() is not None:
+                return "aws_sns"
+        except Exception:
+            pass
+        
+        return "simulated"
+    
+    @staticmethod
+    def setup_instructions(provider: str = None) -> str:
+        """Get setup instructions for SMS provider"""
+        if not provider:
+            provider = SMSConfig.get_recommended_provider()
+        
+        return _SETUP_INSTRUCTIONS.get(provider, _SIMULATED_INSTRUCTIONS)
@@ -3,42 +3,363 @@ SMTP Email Service for Personal Email Integration
 Replaces SendGrid with standard SMTP (Gmail, Outlook, etc.)
 """
 
+import base64
+import functools
 import smtplib
+import socket
 import ssl
+from dataclasses import dataclass, field
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.base import MIMEBase
-from email import encoders
 import os
+import re
+import threading
 from pathlib import Path
 from typing import Dict, Optional, List
 import logging
 from dotenv import load_dotenv
 
+try:
+    from .email_templates import get_intake_templates, get_reminder_templates
+    from .sms_service import SMSService
+except ImportError:
+    # Imported as a top-level module with src/utils on sys.path
+    from email_templates import get_intake_templates, get_reminder_templates
+    from sms_service import SMSService
+
 # Load environment variables
 load_dotenv()
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
+# Module logger; handlers and levels are left to the application (the example below sets INFO)
 logger = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True)
+class SMTPConfig:
+    """SMTP account and clinic settings, read from the environment once"""
+    from_email: str
+    email_password: str = field(repr=False)
+    smtp_server: str
+    smtp_port: int
+    use_ssl: bool
+    clinic_name: str
+    clinic_phone: str
+    emergency_phone: str
+    
+    @classmethod
+    def from_env(cls) -> 'SMTPConfig':
+        """Build a config from the current environment variables"""
+        smtp_port = int(os.getenv('SMTP_PORT', '587'))
+        return cls(
+            from_email=os.getenv('FROM_EMAIL', 'charulchim06@gmail.com'),
+            email_password=os.getenv('EMAIL_PASSWORD', ''),
+            smtp_server=os.getenv('SMTP_SERVER', 'smtp.gmail.com'),
+            smtp_port=smtp_port,
+            # Implicit TLS (SMTPS) saves the STARTTLS round-trip; the default on port 465
+            use_ssl=smtp_port == 465 or os.getenv('SMTP_USE_SSL', '') == '1',
+            clinic_name=os.getenv('CLINIC_NAME', 'Valley Medical Center'),
+            clinic_phone=os.getenv('CLINIC_PHONE', '+1-555-MEDICAL'),
+            emergency_phone=os.getenv('EMERGENCY_PHONE', '(555) 999-8888')
+        )
+    
+    @classmethod
+    def reload(cls) -> 'SMTPConfig':
+        """Re-read the environment into the default config used by new services"""
+        global _CFG
+        _CFG = cls.from_env()
+        return _CFG
+
+
+# Default config for SMTPEmailService, read at import after load_dotenv()
+_CFG = SMTPConfig.from_env()
+
+
+# HTML wrapper for outgoing emails; split around {html_body} once at import and formatted once per clinic
+_HTML_EMAIL_TEMPLATE = """
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <meta charset="UTF-8">
+            <style>
+                body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
+                .header {{ background-color: #f8f9fa; padding: 20px; border-radius: 5px; margin-bottom: 20px; }}
+                .content {{ padding: 20px; }}
+                .footer {{ background-color: #f8f9fa; padding: 15px; margin-top: 20px; font-size: 12px; color: #666; }}
+                .important {{ background-color: #fff3cd; padding: 15px; border-left: 4px solid #ffc107; margin: 15px 0; }}
+                .appointment-details {{ background-color: #e7f3ff; padding: 15px; border-radius: 5px; margin: 15px 0; }}
+            </style>
+        </head>
+        <body>
+            <div class="header">
+                <h2 style="color: #0056b3; margin: 0;">{clinic_name}</h2>
+            </div>
+            <div class="content">
+                {html_body}
+            </div>
+            <div class="footer">
+                <p><strong>{clinic_name}</strong><br>
+                Phone: {clinic_phone}<br>
+                This is an automated message. Please do not reply to this email.</p>
+            </div>
+        </body>
+        </html>
+        """
+
+_HTML_PREFIX_TEMPLATE, _HTML_SUFFIX_TEMPLATE = _HTML_EMAIL_TEMPLATE.split('{html_body}')
+
+
+@functools.lru_cache(maxsize=8)
+def _html_wrapper(clinic_name: str, clinic_phone: str) -> tuple:
+    """HTML before and after the email body for one clinic, shared by every service instance"""
+    return (
+        _HTML_PREFIX_TEMPLATE.format(clinic_name=clinic_name, clinic_phone=clinic_phone),
+        _HTML_SUFFIX_TEMPLATE.format(clinic_name=clinic_name, clinic_phone=clinic_phone),
+    )
+
+
+# Plain text to HTML in one pass: escape markup characters and turn newlines into <br>
+_HTML_TABLE = str.maketrans({'\n': '<br>', '<': '&lt;', '>': '&gt;', '&': '&amp;'})
+
+# Fixed MIME boundary for the direct bytes builder; every part is base64, which can't contain it
+_ALTERNATIVE_BOUNDARY = "==============_alternative_part_boundary_=="
+
+# smtplib only normalizes line endings for str messages, so bytes are generated with CRLF
+_SMTP_LINESEP = '\r\n'
+
+
+def _is_plain_header(value: str) -> bool:
+    """True when a header value is ASCII without line breaks, so it can be written verbatim"""
+    return value.isascii() and '\r' not in value and '\n' not in value
+
+
+def _base64_part(content_type: str, text: str) -> bytes:
+    """One UTF-8, base64-encoded MIME part with its headers"""
+    # Text is encoded in its canonical CRLF form, as on the wire for 7bit parts
+    text = text.replace('\r\n', '\n').replace('\n', '\r\n')
+    return (
+        f'Content-Type: {content_type}; charset="utf-8"\r\n'
+        'MIME-Version: 1.0\r\n'
+        'Content-Transfer-Encoding: base64\r\n\r\n'
+    ).encode('ascii') + base64.encodebytes(text.encode('utf-8')).replace(b'\n', b'\r\n')
+
+
+# Attachment read size: a multiple of 57 bytes, so each chunk encodes to whole 76-character base64 lines
+_ATTACHMENT_CHUNK_SIZE = 57 * 1024
+
+
+def _encoded_attachment(path: str) -> str:
+    """Base64 payload of an attachment file, in 76-character lines"""
+    # Encode chunk by chunk so the raw file never has to be held in memory next to its encoding
+    with open(path, "rb") as attachment:
+        return ''.join(
+            base64.encodebytes(chunk).decode('ascii')
+            for chunk in iter(functools.partial(attachment.read, _ATTACHMENT_CHUNK_SIZE), b'')
+        )
+
+
+# Dot-stuffing for the DATA section, as in smtplib.SMTP.data()
+_LEADING_DOT = re.compile(br'(?m)^\.')
+
+
+def _pipelined_sendmail(server: smtplib.SMTP, from_email: str, to_email: str, message: bytes):
+    """
+    Send one message with MAIL, RCPT and DATA written in a single round trip
+    
+    Uses ESMTP PIPELINING (RFC 2920) when the server advertises it, saving two
+    round trips per message over smtplib's sendmail; otherwise falls back to sendmail.
+    """
+    server.ehlo_or_helo_if_needed()
+    if not server.has_extn('pipelining') or not _is_plain_header(from_email) or not _is_plain_header(to_email):
+        server.sendmail(from_email, to_email, message)
+        return
+    
+    server.send(f"MAIL FROM:{smtplib.quoteaddr(from_email)}\r\n"
+                f"RCPT TO:{smtplib.quoteaddr(to_email)}\r\n"
+                "DATA\r\n")
+    # Every pipelined command gets a reply, so all three are read before acting on a failure
+    mail_reply, rcpt_reply, data_reply = server.getreply(), server.getreply(), server.getreply()
+    
+    if data_reply[0] == 354 and (mail_reply[0] != 250 or rcpt_reply[0] not in (250, 251)):
+        # Server is waiting for content of a transaction that already failed; end it empty
+        server.send(b'.\r\n')
+        server.getreply()
+    if mail_reply[0] != 250:
+        server.rset()
+        raise smtplib.SMTPSenderRefused(mail_reply[0], mail_reply[1], from_email)
+    if rcpt_reply[0] not in (250, 251):
+        server.rset()
+        raise smtplib.SMTPRecipientsRefused({to_email: rcpt_reply})
+    if data_reply[0] != 354:
+        server.rset()
+        raise smtplib.SMTPDataError(*data_reply)
+    
+    data = _LEADING_DOT.sub(b'..', message)
+    if not data.endswith(b'\r\n'):
+        data += b'\r\n'
+    server.send(data + b'.\r\n')
+    code, resp = server.getreply()
+    if code != 250:
+        server.rset()
+        raise smtplib.SMTPDataError(code, resp)
+
+
+class _ResumingSSLContext(ssl.SSLContext):
+    """
+    Client TLS context that offers the last saved session when reconnecting to a host
+    
+    smtplib has no way to pass a session to SMTP_SSL or starttls(), so the context
+    supplies it; a resumed handshake skips the full key exchange. It also maps the
+    pre-resolved IP address smtplib connects to back to the server's hostname, so
+    SNI and certificate checks still use the name.
+    """
+    
+    def __init__(self, protocol=ssl.PROTOCOL_TLS_CLIENT):
+        self.sessions = {}
+        self.hostnames = {}
+        # Every service shares one context, so its maps are updated from several threads
+        self._maps_lock = threading.Lock()
+    
+    def wrap_socket(self, sock, *args, server_hostname=None, session=None, **kwargs):
+        with self._maps_lock:
+            server_hostname = self.hostnames.get(server_hostname, server_hostname)
+            if session is None:
+                session = self.sessions.get(server_hostname)
+        return super().wrap_socket(sock, *args, server_hostname=server_hostname, session=session, **kwargs)
+    
+    def map_hostname(self, address: str, server_hostname: str):
+        """Use server_hostname for SNI and certificate checks on connections to address"""
+        with self._maps_lock:
+            self.hostnames[address] = server_hostname
+    
+    def save_session(self, server_hostname: str, sock):
+        """Keep a connected socket's TLS session for the next connection to the same host"""
+        session = getattr(sock, 'session', None)
+        if session is not None:
+            with self._maps_lock:
+                self.sessions[server_hostname] = session
+
+
+@functools.lru_cache(maxsize=8)
+def _resolve_smtp_host(host: str, port: int) -> str:
+    """IP address of an SMTP server, looked up once instead of on every connection"""
+    return socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)[0][4][0]
+
+
+def _create_ssl_context() -> _ResumingSSLContext:
+    """Certificate-verifying client context with the same settings as ssl.create_default_context()"""
+    context = _ResumingSSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    context.load_default_certs(ssl.Purpose.SERVER_AUTH)
+    return context
+
+
 class SMTPEmailService:
     """SMTP Email service for sending emails via personal email accounts"""
     
-    def __init__(self):
-        """Initialize SMTP service with environment variables"""
-        self.from_email = os.getenv('FROM_EMAIL', 'charulchim06@gmail.com')
-        self.email_password = os.getenv('EMAIL_PASSWORD', '')
-        self.smtp_server = os.getenv('SMTP_SERVER', 'smtp.gmail.com')
-        self.smtp_port = int(os.getenv('SMTP_PORT', '587'))
+    # One TLS context for every connection instead of building a new one per handshake;
+    # it also remembers sessions so reconnects resume them
+    _SSL_CONTEXT = _create_ssl_context()
+    
+    def __init__(self, config: Optional[SMTPConfig] = None):
+        """
+        Initialize SMTP service
+        
+        Args:
+            config: SMTP and clinic settings; defaults to the config read from
+                the environment at import (see SMTPConfig.reload)
+        """
+        config = config or _CFG
+        self.from_email = config.from_email
+        self.email_password = config.email_password
+        self.smtp_server = config.smtp_server
+        self.smtp_port = config.smtp_port
+        self.use_ssl = config.use_ssl
         
         # Clinic information
-        self.clinic_name = os.getenv('CLINIC_NAME', 'Valley Medical Center')
-        self.clinic_phone = os.getenv('CLINIC_PHONE', '+1-555-MEDICAL')
+        self.clinic_name = config.clinic_name
+        self.clinic_phone = config.clinic_phone
+        self.emergency_phone = config.emergency_phone
+        
+        self._build_html_wrapper()
+        
+        # Template instances for this clinic, resolved once instead of on every send
+        self._intake_templates = get_intake_templates(self.clinic_name, self.clinic_phone)
+        self._reminder_templates = get_reminder_templates(self.clinic_name, self.clinic_phone, self.emergency_phone)
+        
+        # Connections reused across sends so bulk reminder runs handshake and log in once
+        self._server = None
+        self._sms_service = None
+        # smtplib.SMTP is not thread-safe, so sends on the shared session are serialized
+        self._lock = threading.Lock()
         
         logger.info(f"SMTP Email Service initialized for {self.from_email}")
     
+    def _get_server(self) -> smtplib.SMTP:
+        """Return the open authenticated SMTP connection, connecting on first use"""
+        if self._server is None:
+            self._server = self._connect()
+        return self._server
+    
+    def _connect(self) -> smtplib.SMTP:
+        """Open a new secured SMTP connection and log in"""
+        address = _resolve_smtp_host(self.smtp_server, self.smtp_port)
+        self._SSL_CONTEXT.map_hostname(address, self.smtp_server)
+        try:
+            if self.use_ssl:
+                server = smtplib.SMTP_SSL(address, self.smtp_port, context=self._SSL_CONTEXT)
+            else:
+                server = smtplib.SMTP(address, self.smtp_port)
+        except OSError:
+            # The cached address may be stale; look the server up again next time
+            _resolve_smtp_host.cache_clear()
+            raise
+        try:
+            if not self.use_ssl:
+                server.starttls(context=self._SSL_CONTEXT)  # Enable security
+            server.login(self.from_email, self.email_password)
+        except Exception:
+            server.close()
+            raise
+        # After login the server has spoken over TLS, so a TLS 1.3 session ticket has arrived
+        self._SSL_CONTEXT.save_session(self.smtp_server, server.sock)
+        return server
+    
+    def _drop_server(self):
+        """Discard the cached SMTP connection so the next send reconnects"""
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except Exception:
+                self._server.close()
+            self._server = None
+    
+    def _sendmail(self, to_email: str, message: bytes):
+        """Send over the shared session, reconnecting once if the server dropped an idle connection"""
+        with self._lock:
+            try:
+                _pipelined_sendmail(self._get_server(), self.from_email, to_email, message)
+            except smtplib.SMTPServerDisconnected:
+                self._drop_server()
+                try:
+                    _pipelined_sendmail(self._get_server(), self.from_email, to_email, message)
+                except Exception:
+                    self._drop_server()
+                    raise
+            except Exception:
+                self._drop_server()
+                raise
+    
+    def close(self):
+        """Close the shared SMTP connection, if one is open"""
+        with self._lock:
+            self._drop_server()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
     def send_email(self, to_email: str, subject: str, body: str, 
                    html_body: Optional[str] = None, attachments: Optional[List[str]] = None) -> bool:
         """
@@ -55,54 +376,75 @@ class SMTPEmailService:
             bool: True if email sent successfully, False otherwise
         """
         try:
-            # Create message
-            msg = MIMEMultipart('alternative')
-            msg['From'] = self.from_email
-            msg['To'] = to_email
-            msg['Subject'] = subject
-            
-            # Add plain text part
-            text_part = MIMEText(body, 'plain')
-            msg.attach(text_part)
-            
-            # Add HTML part if provided
-            if html_body:
-                html_part = MIMEText(html_body, 'html')
-                msg.attach(html_part)
-            
-            # Add attachments if provided
-            if attachments:
-                for file_path in attachments:
-                    if os.path.exists(file_path):
-                        self._add_attachment(msg, file_path)
-                    else:
-                        logger.warning(f"Attachment not found: {file_path}")
-            
-            # Create SMTP session
-            server = smtplib.SMTP(self.smtp_server, self.smtp_port)
-            server.starttls()  # Enable security
-            
-            # Login and send email
-            server.login(self.from_email, self.email_password)
-            text = msg.as_string()
-            server.sendmail(self.from_email, to_email, text)
-            server.quit()
+            message = self._build_message(to_email, subject, body, html_body, attachments)
+            
+            # Send over the shared SMTP session
+            self._sendmail(to_email, message)
             
-            logger.info(f"Email sent successfully to {to_email}")
+            logger.info("Email sent successfully to %s", to_email)
             return True
             
         except Exception as e:
             logger.error(f"Failed to send email to {to_email}: {str(e)}")
             return False
     
+    def _build_message(self, to_email: str, subject: str, body: str,
+                       html_body: Optional[str] = None, attachments: Optional[List[str]] = None) -> bytes:
+        """Build a MIME message and serialize it to the bytes sent over SMTP"""
+        # Simple text/html emails skip the email package; attachments and encoded headers still use it
+        if not attachments and all(_is_plain_header(value) for value in (self.from_email, to_email, subject)):
+            return self._compose_bytes(to_email, subject, body, html_body)
+        
+        # Create message
+        msg = MIMEMultipart('alternative')
+        msg['From'] = self.from_email
+        msg['To'] = to_email
+        msg['Subject'] = subject
+        
+        # Add plain text part
+        text_part = MIMEText(body, 'plain')
+        msg.attach(text_part)
+        
+        # Add HTML part if provided
+        if html_body:
+            html_part = MIMEText(html_body, 'html')
+            msg.attach(html_part)
+        
+        # Add attachments if provided
+        if attachments:
+            for file_path in attachments:
+                if os.path.exists(file_path):
+                    self._add_attachment(msg, file_path)
+                else:
+                    logger.warning(f"Attachment not found: {file_path}")
+        
+        # as_bytes() runs the BytesGenerator directly, skipping the str round-trip of as_string()
+        return msg.as_bytes(policy=msg.policy.clone(linesep=_SMTP_LINESEP))
+    
+    def _compose_bytes(self, to_email: str, subject: str, body: str, html_body: Optional[str] = None) -> bytes:
+        """Write a multipart/alternative text (and optional HTML) email straight to bytes"""
+        message = bytearray(
+            f'Content-Type: multipart/alternative; boundary="{_ALTERNATIVE_BOUNDARY}"\r\n'
+            'MIME-Version: 1.0\r\n'
+            f'From: {self.from_email}\r\n'
+            f'To: {to_email}\r\n'
+            f'Subject: {subject}\r\n\r\n'.encode('ascii')
+        )
+        message += f'--{_ALTERNATIVE_BOUNDARY}\r\n'.encode('ascii')
+        message += _base64_part('text/plain', body)
+        if html_body:
+            message += f'\r\n--{_ALTERNATIVE_BOUNDARY}\r\n'.encode('ascii')
+            message += _base64_part('text/html', html_body)
+        message += f'\r\n--{_ALTERNATIVE_BOUNDARY}--\r\n'.encode('ascii')
+        return bytes(message)
+    
     def _add_attachment(self, msg: MIMEMultipart, file_path: str):
         """Add file attachment to email message"""
         try:
-            with open(file_path, "rb") as attachment:
-                part = MIMEBase('application', 'octet-stream')
-                part.set_payload(attachment.read())
-            
-            encoders.encode_base64(part)
+            part = MIMEBase('application', 'octet-stream')
+            # Same payload and header encoders.encode_base64 would produce
+            part.set_payload(_encoded_attachment(file_path))
+            part['Content-Transfer-Encoding'] = 'base64'
             part.add_header(
                 'Content-Disposition',
                 f'attachment; filename= {os.path.basename(file_path)}'
@@ -123,13 +465,11 @@ class SMTPEmailService:
             bool: True if email sent successfully
         """
         try:
-            from .email_templates import IntakeFormEmailTemplates
-            
-            templates = IntakeFormEmailTemplates(self.clinic_name, self.clinic_phone)
+            templates = self._intake_templates
             email_content = templates.appointment_confirmation_with_intake_form(patient_data)
             
             # Create HTML version
-            html_body = self._create_html_email(email_content['body'])
+            html_body = self._create_html_email(email_content.body)
             
             # Add intake form attachment if available
             attachments = []
@@ -139,8 +479,8 @@ class SMTPEmailService:
             
             return self.send_email(
                 to_email=patient_data.get('email', ''),
-                subject=email_content['subject'],
-                body=email_content['body'],
+                subject=email_content.subject,
+                body=email_content.body,
                 html_body=html_body,
                 attachments=attachments
             )
@@ -152,17 +492,15 @@ class SMTPEmailService:
     def send_intake_form_reminder(self, patient_data: Dict) -> bool:
         """Send intake form completion reminder"""
         try:
-            from .email_templates import IntakeFormEmailTemplates
-            
-            templates = IntakeFormEmailTemplates(self.clinic_name, self.clinic_phone)
+            templates = self._intake_templates
             email_content = templates.intake_form_reminder(patient_data)
             
-            html_body = self._create_html_email(email_content['body'])
+            html_body = self._create_html_email(email_content.body)
             
             return self.send_email(
                 to_email=patient_data.get('email', ''),
-                subject=email_content['subject'],
-                body=email_content['body'],
+                subject=email_content.subject,
+                body=email_content.body,
                 html_body=html_body
             )
             
@@ -174,21 +512,19 @@ class SMTPEmailService:
                               form_file_path: str = None) -> bool:
         """Send intake form to patient with optional form attachment"""
         try:
-            from .email_templates import IntakeFormEmailTemplates
-            
-            templates = IntakeFormEmailTemplates(self.clinic_name, self.clinic_phone)
+            templates = self._intake_templates
             
             # Prepare combined data for email template
             combined_data = {**patient_data, **appointment_data}
             email_content = templates.intake_form_email(combined_data)
             
-            html_body = self._create_html_email(email_content['body'])
+            html_body = self._create_html_email(email_content.body)
             
             # Send email with optional attachment
             success = self.send_email(
                 to_email=patient_data.get('email', ''),
-                subject=email_content['subject'],
-                body=email_content['body'],
+                subject=email_content.subject,
+                body=email_content.body,
                 html_body=html_body,
                 attachment_path=form_file_path
             )
@@ -207,17 +543,15 @@ class SMTPEmailService:
     def send_intake_form_confirmation(self, patient_data: Dict) -> bool:
         """Send intake form received confirmation"""
         try:
-            from .email_templates import IntakeFormEmailTemplates
-            
-            templates = IntakeFormEmailTemplates(self.clinic_name, self.clinic_phone)
+            templates = self._intake_templates
             email_content = templates.intake_form_received_confirmation(patient_data)
             
-            html_body = self._create_html_email(email_content['body'])
+            html_body = self._create_html_email(email_content.body)
             
             return self.send_email(
                 to_email=patient_data.get('email', ''),
-                subject=email_content['subject'],
-                body=email_content['body'],
+                subject=email_content.subject,
+                body=email_content.body,
                 html_body=html_body
             )
             
@@ -225,67 +559,32 @@ class SMTPEmailService:
             logger.error(f"Failed to send intake form confirmation: {str(e)}")
             return False
     
+    def _build_html_wrapper(self):
+        """Format the clinic-specific HTML around the email body; call again after changing clinic details"""
+        self._html_prefix, self._html_suffix = _html_wrapper(self.clinic_name, self.clinic_phone)
+    
     def _create_html_email(self, text_body: str) -> str:
         """Convert plain text email to HTML format"""
-        # Simple HTML conversion - replace newlines with <br> and add basic styling
-        html_body = text_body.replace('\n', '<br>')
-        
-        html_template = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="UTF-8">
-            <style>
-                body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-                .header {{ background-color: #f8f9fa; padding: 20px; border-radius: 5px; margin-bottom: 20px; }}
-                .content {{ padding: 20px; }}
-                .footer {{ background-color: #f8f9fa; padding: 15px; margin-top: 20px; font-size: 12px; color: #666; }}
-                .important {{ background-color: #fff3cd; padding: 15px; border-left: 4px solid #ffc107; margin: 15px 0; }}
-                .appointment-details {{ background-color: #e7f3ff; padding: 15px; border-radius: 5px; margin: 15px 0; }}
-            </style>
-        </head>
-        <body>
-            <div class="header">
-                <h2 style="color: #0056b3; margin: 0;">{self.clinic_name}</h2>
-            </div>
-            <div class="content">
-                {html_body}
-            </div>
-            <div class="footer">
-                <p><strong>{self.clinic_name}</strong><br>
-                Phone: {self.clinic_phone}<br>
-                This is an automated message. Please do not reply to this email.</p>
-            </div>
-        </body>
-        </html>
-        """
-        
-        return html_template
+        # Simple HTML conversion - escape patient-supplied text and replace newlines with <br>
+        return f"{self._html_prefix}{text_body.translate(_HTML_TABLE)}{self._html_suffix}"
     
     def send_appointment_reminder(self, appointment_data: Dict, reminder_type: str = "regular", 
                                 reminder_timing: str = "24h") -> bool:
         """Send appointment reminder email"""
         try:
-            from .email_templates import AppointmentReminderTemplates
-            
-            templates = AppointmentReminderTemplates(self.clinic_name, self.clinic_phone)
+            templates = self._reminder_templates
             
-            if reminder_type == "regular":
-                email_content = templates.regular_appointment_reminder(appointment_data, reminder_timing)
-            elif reminder_type == "form_check":
-                email_content = templates.form_completion_reminder(appointment_data)
-            elif reminder_type == "confirmation":
-                email_content = templates.visit_confirmation_reminder(appointment_data)
-            else:
+            email_content = templates.build(reminder_type, appointment_data, reminder_timing)
+            if email_content is None:
                 logger.error(f"Unknown reminder type: {reminder_type}")
                 return False
             
-            html_body = self._create_html_email(email_content['body'])
+            html_body = self._create_html_email(email_content.body)
             
             success = self.send_email(
                 to_email=appointment_data.get('patient_email', ''),
-                subject=email_content['subject'],
-                body=email_content['body'],
+                subject=email_content.subject,
+                body=email_content.body,
                 html_body=html_body
             )
             
@@ -303,17 +602,15 @@ class SMTPEmailService:
     def send_sms_reminder(self, appointment_data: Dict, reminder_type: str = "regular") -> bool:
         """Send SMS reminder using enhanced SMS service"""
         try:
-            from .email_templates import AppointmentReminderTemplates
-            from .sms_service import SMSService
-            
-            templates = AppointmentReminderTemplates(self.clinic_name, self.clinic_phone)
+            templates = self._reminder_templates
             sms_message = templates.sms_templates(appointment_data, reminder_type)
             
-            # Initialize SMS service
-            sms_service = SMSService()  # Uses simulated by default
+            # Initialize SMS service once and reuse its client for later reminders
+            if self._sms_service is None:
+                self._sms_service = SMSService()  # Uses simulated by default
             
             # Send SMS
-            result = sms_service.send_sms(
+            result = self._sms_service.send_sms(
                 to_phone=appointment_data.get('patient_phone', ''),
                 message=sms_message,
                 appointment_id=appointment_data.get('appointment_id', '')
@@ -332,13 +629,46 @@ class SMTPEmailService:
             logger.error(f"Failed to send SMS reminder: {str(e)}")
             return False
     
+    def fast_probe(self, timeout: float = 2.0) -> bool:
+        """
+        Check that the SMTP server accepts TCP connections, without TLS or login
+        
+        One round trip instead of a full handshake, and an unreachable server
+        fails after timeout seconds rather than the operating system's connect timeout.
+        
+        Args:
+            timeout: Seconds to wait for the connection
+            
+        Returns:
+            bool: True if the server is reachable
+        """
+        try:
+            address = _resolve_smtp_host(self.smtp_server, self.smtp_port)
+            with socket.create_connection((address, self.smtp_port), timeout=timeout):
+                return True
+        except OSError as e:
+            _resolve_smtp_host.cache_clear()
+            logger.error(f"SMTP server {self.smtp_server}:{self.smtp_port} is not reachable: {str(e)}")
+            return False
+    
     def test_connection(self) -> bool:
-        """Test SMTP connection and authentication"""
+        """
+        Test SMTP connection and authentication
+        
+        Probes the shared session with NOOP, logging in first if no session is
+        open yet: implicit TLS (SMTP_SSL) when SMTP_PORT is 465 or SMTP_USE_SSL=1,
+        otherwise STARTTLS on the configured port. The session stays open for the
+        sends that follow; call close() or use the service as a context manager.
+        """
         try:
-            server = smtplib.SMTP(self.smtp_server, self.smtp_port)
-            server.starttls()
-            server.login(self.from_email, self.email_password)
-            server.quit()
+            with self._lock:
+                if self._server is not None:
+                    try:
+                        self._server.noop()
+                    except smtplib.SMTPServerDisconnected:
+                        # Idle connection dropped by the server; log in again
+                        self._server = None
+                self._get_server()
             
             logger.info("SMTP connection test successful")
             return True
@@ -354,9 +684,11 @@ class SMTPEmailService:
 
 # Example usage and testing
 if __name__ == "__main__":
-    # Load environment variables
-    from dotenv import load_dotenv
+    logging.basicConfig(level=logging.INFO)
+    
+    # Fill unset variables from the example file and re-read the config
     load_dotenv('.env.example')
+    SMTPConfig.reload()
     
     # Initialize email service
     email_service = SMTPEmailService()
@@ -1,130 +1,311 @@
 #!/usr/bin/env python3
 """
 Test the SMTP Email Service with Personal Email
+
+The SMTP transport is mocked unless E2E_EMAIL=1 is set, so a default run
+(e.g. in CI) makes no network calls and sends no real email.
 """
 
+import asyncio
+import contextlib
+import functools
 import sys
 import os
+import textwrap
+import types
 from pathlib import Path
+from unittest import mock
 
-# Add src to path for imports
+# Add src to the front of the path, so utils/agents resolve on the first entry
+# instead of after every site-packages directory
 current_dir = Path(__file__).parent
-sys.path.append(str(current_dir / 'src'))
+sys.path.insert(0, str(current_dir / 'src'))
 
-def test_email_service():
-    """Test the SMTP email service"""
+# Static text around the tests, each written with a single call
+INTRO = textwrap.dedent("""\
+    🏥 Medical Scheduling System - Email Integration Test
+    Using Personal Email: charulchim06@gmail.com
+    No SendGrid Required!
     
-    print("🧪 Testing Personal Email Integration")
-    print("="*50)
     
+""")
+
+SUMMARY = textwrap.dedent("""
+    ✨ Email Integration Summary:
+    • ✅ Personal Gmail integration configured
+    • ✅ SMTP service replaces SendGrid
+    • ✅ No external API keys needed (except Gmail App Password)
+    • ✅ HTML email templates with clinic branding
+    • ✅ Appointment confirmations and intake forms
+    
+    To complete setup:
+    1. Enable 2FA on your Gmail account
+    2. Generate App Password for this application
+    3. Set EMAIL_PASSWORD in your .env file
+    4. Test by running this script again
+""")
+
+OFFLINE_NOTE = "🔌 Offline run: SMTP transport mocked (set E2E_EMAIL=1 to send real email)\n\n"
+
+# Rule printed under each test's heading
+BANNER = "="*50
+
+# Read-only test appointment, built once for every run of the email test
+TEST_PATIENT_DATA = types.MappingProxyType({
+    "first_name": "Test",
+    "last_name": "Patient",
+    "email": "charulchim06@gmail.com",  # Your email
+    "appointment_date": "September 10, 2025",
+    "appointment_time": "2:00 PM",
+    "doctor_name": "Dr. Emily Smith",
+    "clinic_address": "123 Health St, Medical City, MC 12345",
+    "intake_form_link": "https://clinic.example.com/intake/test123"
+})
+
+# Stand-in password for offline runs, so the login and send path is exercised against the mock
+OFFLINE_PASSWORD = "offline-test-password"
+
+@contextlib.contextmanager
+def offline_smtp():
+    """Replace the SMTP transport with a mock server, so the tests make no network calls"""
+    server = mock.MagicMock()
+    server.sock = None
+    server.has_extn.return_value = False  # Plain sendmail rather than hand-written pipelining
+    server.sendmail.return_value = {}
     try:
-        from utils.smtp_email_service import SMTPEmailService
-        print("✅ Successfully imported SMTPEmailService")
-    except ImportError as e:
-        print(f"❌ Failed to import email service: {e}")
-        return
+        from utils.smtp_email_service import SMTPConfig
+    except ImportError:
+        SMTPConfig = None
+    with mock.patch("smtplib.SMTP", return_value=server), \
+            mock.patch("smtplib.SMTP_SSL", return_value=server), \
+            mock.patch("socket.create_connection"), \
+            mock.patch("socket.getaddrinfo", return_value=[(None, None, None, "", ("127.0.0.1", 0))]), \
+            mock.patch.dict(os.environ, EMAIL_PASSWORD=os.getenv("EMAIL_PASSWORD") or OFFLINE_PASSWORD):
+        # Services built from here on read the patched environment
+        if SMTPConfig is not None:
+            SMTPConfig.reload()
+        try:
+            yield server
+        finally:
+            if SMTPConfig is not None:
+                SMTPConfig.reload()
+
+def write_lines(lines):
+    """Write a test's output lines to stdout with a single write"""
+    sys.stdout.write("\n".join(lines) + "\n")
+
+@functools.lru_cache(maxsize=1)
+def get_email_service():
+    """SMTP email service shared by both tests, imported and constructed once"""
+    from utils.smtp_email_service import SMTPEmailService
+    return SMTPEmailService()
+
+def check_connection(email_service):
+    """Cheap TCP reachability probe first, then TLS and login on the shared session"""
+    return email_service.fast_probe() and email_service.test_connection()
+
+async def check_email_service(connection_test=None):
+    """
+    Test the SMTP email service
+    
+    Args:
+        connection_test: Awaitable for a connection test already running in
+            the background (optional; the connection is tested here if not given)
+    
+    Returns:
+        True if the test appointment confirmation email was sent
+    """
+    # Collected and written to stdout in one go at the end
+    out = []
+    sent = False
+    
+    out.append("🧪 Testing Personal Email Integration")
+    out.append(BANNER)
     
-    # Initialize email service
-    email_service = SMTPEmailService()
+    try:
+        email_service = get_email_service()
+        out.append("✅ Successfully imported SMTPEmailService")
+    except ImportError as e:
+        out.append(f"❌ Failed to import email service: {e}")
+        write_lines(out)
+        return sent
     
-    print(f"📧 Email Service Configuration:")
-    print(f"   From Email: {email_service.from_email}")
-    print(f"   SMTP Server: {email_service.smtp_server}")
-    print(f"   SMTP Port: {email_service.smtp_port}")
-    print(f"   Clinic Name: {email_service.clinic_name}")
+    out.append(f"📧 Email Service Configuration:")
+    out.append(f"   From Email: {email_service.from_email}")
+    out.append(f"   SMTP Server: {email_service.smtp_server}")
+    out.append(f"   SMTP Port: {email_service.smtp_port}")
+    out.append(f"   Clinic Name: {email_service.clinic_name}")
     
     # Test connection (only if password is set)
     if email_service.email_password:
-        print("\n🔗 Testing SMTP Connection...")
-        if email_service.test_connection():
-            print("✅ SMTP connection successful!")
+        out.append("\n🔗 Testing SMTP Connection...")
+        if await (connection_test or asyncio.to_thread(check_connection, email_service)):
+            out.append("✅ SMTP connection successful!")
             
             # Test sending email
-            print("\n📬 Testing email sending...")
-            
-            patient_data = {
-                "first_name": "Test",
-                "last_name": "Patient",
-                "email": "charulchim06@gmail.com",  # Your email
-                "appointment_date": "September 10, 2025",
-                "appointment_time": "2:00 PM",
-                "doctor_name": "Dr. Emily Smith",
-                "clinic_address": "123 Health St, Medical City, MC 12345",
-                "intake_form_link": "https://clinic.example.com/intake/test123"
-            }
+            out.append("\n📬 Testing email sending...")
             
-            if email_service.send_appointment_confirmation(patient_data):
-                print("✅ Test appointment confirmation email sent!")
-                print(f"📨 Check your inbox at {patient_data['email']}")
+            sent = await asyncio.to_thread(email_service.send_appointment_confirmation, TEST_PATIENT_DATA)
+            if sent:
+                out.append("✅ Test appointment confirmation email sent!")
+                out.append(f"📨 Check your inbox at {TEST_PATIENT_DATA['email']}")
             else:
-                print("❌ Failed to send test email")
+                out.append("❌ Failed to send test email")
                 
         else:
-            print("❌ SMTP connection failed")
+            out.append("❌ SMTP connection failed")
     else:
-        print("\n⚠️  EMAIL_PASSWORD not configured")
-        print("To enable email functionality:")
-        print("1. Set up 2-factor authentication on Gmail")
-        print("2. Generate App Password: https://myaccount.google.com/apppasswords")
-        print("3. Add EMAIL_PASSWORD=your_app_password to .env file")
+        out.append("\n⚠️  EMAIL_PASSWORD not configured")
+        out.append("To enable email functionality:")
+        out.append("1. Set up 2-factor authentication on Gmail")
+        out.append("2. Generate App Password: https://myaccount.google.com/apppasswords")
+        out.append("3. Add EMAIL_PASSWORD=your_app_password to .env file")
     
-    print("\n📝 Current .env configuration:")
+    out.append("\n📝 Current .env configuration:")
     env_file = Path(".env.example")
-    if env_file.exists():
-        print("✅ .env.example file found")
-        with open(env_file) as f:
-            for line in f:
-                if "EMAIL" in line or "SMTP" in line:
-                    print(f"   {line.strip()}")
+    try:
+        # One read, no separate exists() check; a missing file is the exception
+        env_text = env_file.read_text()
+    except FileNotFoundError:
+        out.append("❌ .env.example file not found")
     else:
-        print("❌ .env.example file not found")
+        out.append("✅ .env.example file found")
+        out.extend(f"   {line.strip()}" for line in env_text.splitlines() if "EMAIL" in line or "SMTP" in line)
+    
+    write_lines(out)
+    return sent
 
-def test_agent_with_email():
-    """Test the scheduling agent with email integration"""
+def load_agent():
+    """Import and construct the scheduling agent (slow: pulls in LangChain and the data files)"""
+    from agents.scheduling_agent import MedicalSchedulingAgent
+    try:
+        email_service = get_email_service()
+    except ImportError:
+        email_service = None
+    return MedicalSchedulingAgent(email_service=email_service)
+
+async def check_agent_with_email(agent_loading=None):
+    """
+    Test the scheduling agent with email integration
     
-    print("\n🤖 Testing Scheduling Agent with Email")
-    print("="*50)
+    Args:
+        agent_loading: Awaitable for an agent already being loaded in the
+            background (optional; the agent is loaded here if not given)
+    
+    Returns:
+        The agent's reply to the intake form request, or None if the agent failed
+    """
+    out = []
+    response = None
+    
+    out.append("\n🤖 Testing Scheduling Agent with Email")
+    out.append(BANNER)
     
     try:
-        from agents.scheduling_agent import MedicalSchedulingAgent
-        agent = MedicalSchedulingAgent()
+        agent = await (agent_loading or asyncio.to_thread(load_agent))
         
-        print("✅ Scheduling agent initialized")
+        out.append("✅ Scheduling agent initialized")
         
         if agent.email_service:
-            print("✅ Email service loaded successfully")
-            print("📧 Email integration: ENABLED")
+            out.append("✅ Email service loaded successfully")
+            out.append("📧 Email integration: ENABLED")
         else:
-            print("⚠️  Email service not available")
-            print("📧 Email integration: DISABLED")
+            out.append("⚠️  Email service not available")
+            out.append("📧 Email integration: DISABLED")
         
         # Test intake form sending
-        print("\n📋 Testing intake form sending...")
-        response = agent._send_intake_form("patient_email=charulchim06@gmail.com")
-        print(f"Response: {response}")
+        out.append("\n📋 Testing intake form sending...")
+        response = await asyncio.to_thread(agent._send_intake_form, patient_email=TEST_PATIENT_DATA["email"])
+        out.append(f"Response: {response}")
         
     except ImportError as e:
-        print(f"❌ Failed to import scheduling agent: {e}")
+        out.append(f"❌ Failed to import scheduling agent: {e}")
     except Exception as e:
-        print(f"❌ Error testing agent: {e}")
+        out.append(f"❌ Error testing agent: {e}")
+    
+    write_lines(out)
+    return response
+
+async def main():
+    """Run both tests on one email service, with the SMTP handshake and agent load started together"""
+    # Build the shared email service before the agent starts loading with it
+    try:
+        email_service = get_email_service()
+    except ImportError:
+        email_service = None
+    
+    # Without a password the agent's email integration can only be disabled,
+    # so skip importing the agent (LangChain and friends) altogether
+    if not (email_service and email_service.email_password):
+        # No password, so no SMTP session is ever opened and there is nothing to close
+        await check_email_service()
+        write_lines([
+            "\n🤖 Testing Scheduling Agent with Email",
+            BANNER,
+            "⚠️  EMAIL_PASSWORD not configured - skipping the scheduling agent test",
+            "📧 Email integration: DISABLED",
+        ])
+        return
+    
+    # Neither blocking job waits for the other: each gets its own worker thread
+    agent_loading = asyncio.ensure_future(asyncio.to_thread(load_agent))
+    connection_test = asyncio.ensure_future(asyncio.to_thread(check_connection, email_service))
+    try:
+        await check_email_service(connection_test)
+        await check_agent_with_email(agent_loading)
+    finally:
+        # One SMTP session served both tests; close it once at the end
+        email_service.close()
+
+@contextlib.contextmanager
+def smtp_transport():
+    """Mock SMTP server for an offline run, or None when E2E_EMAIL=1 asks for real email"""
+    if os.getenv("E2E_EMAIL") == "1":
+        yield None
+    else:
+        with offline_smtp() as server:
+            yield server
+
+def run(coro):
+    """Run a coroutine on the SMTP transport chosen by smtp_transport"""
+    with smtp_transport():
+        return asyncio.run(coro)
+
+def run_check(check):
+    """
+    Run one check on a fresh email service, for the pytest entry points
+    
+    Returns:
+        Tuple of (check result, mock SMTP server or None for a real send)
+    """
+    get_email_service.cache_clear()
+    with smtp_transport() as server:
+        try:
+            return asyncio.run(check()), server
+        finally:
+            get_email_service().close()
+
+# Synchronous entry points, so pytest can collect the checks without an asyncio plugin
+def test_email_service():
+    """Test the SMTP email service"""
+    sent, server = run_check(check_email_service)
+    assert sent
+    if server is not None:
+        assert server.sendmail.call_args.args[1] == TEST_PATIENT_DATA["email"]
+
+def test_agent_with_email():
+    """Test the scheduling agent with email integration"""
+    import pytest
+    pytest.importorskip("agents.scheduling_agent")
+    
+    response, server = run_check(check_agent_with_email)
+    assert response is not None and "✅ Intake form email sent successfully!" in response
+    if server is not None:
+        assert server.sendmail.call_args.args[1] == TEST_PATIENT_DATA["email"]
 
 if __name__ == "__main__":
-    print("🏥 Medical Scheduling System - Email Integration Test")
-    print("Using Personal Email: charulchim06@gmail.com")
-    print("No SendGrid Required!")
-    print("\n")
-    
-    test_email_service()
-    test_agent_with_email()
-    
-    print("\n✨ Email Integration Summary:")
-    print("• ✅ Personal Gmail integration configured")
-    print("• ✅ SMTP service replaces SendGrid")
-    print("• ✅ No external API keys needed (except Gmail App Password)")
-    print("• ✅ HTML email templates with clinic branding")
-    print("• ✅ Appointment confirmations and intake forms")
-    print("\nTo complete setup:")
-    print("1. Enable 2FA on your Gmail account")
-    print("2. Generate App Password for this application")
-    print("3. Set EMAIL_PASSWORD in your .env file")
-    print("4. Test by running this script again")
+    sys.stdout.write(INTRO)
+    if os.getenv("E2E_EMAIL") != "1":
+        sys.stdout.write(OFFLINE_NOTE)
+    run(main())
+    sys.stdout.write(SUMMARY)